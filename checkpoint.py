@@ -0,0 +1,105 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Write and read checkpoint files so that a long running
+#                   partitioning of the parameter space can be resumed after an
+#                   interruption. A checkpoint stores the basis and endpoints of
+#                   every invariancy region discovered so far, as well as the
+#                   (interval, basis) pairs that are still waiting to be
+#                   processed.
+#
+################################################################################
+
+import os
+
+
+# Define Functions
+
+# Convert a (possibly Pari) number to a string that can be parsed by Pari
+#
+# Input:    val --  the value to convert
+#
+# Output:   a string representation of val
+def NumToStr(val):
+    if isinstance(val, float):
+        return repr(val)
+    return str(val).replace(" ", "")
+
+# Convert a basis to a comma delimited string
+#
+# Input:    basis   --  a list indicating the basic variables
+#
+# Output:   a string representation of basis
+def BasisToStr(basis):
+    return ",".join([str(b) for b in basis])
+
+# Write a checkpoint file. The file is first written under a temporary name and
+# then moved into place so that an interruption during writing never destroys
+# the previous checkpoint.
+#
+# Input:    filename    --  the name of the checkpoint file
+#           numVar      --  the number of variables present in the current
+#                           instance
+#           regions     --  a list of (endPoints, basis) pairs describing the
+#                           invariancy regions discovered so far
+#           pending     --  a list of (interval, basis) pairs describing the
+#                           intervals that have not yet been processed
+def WriteCheckpoint(filename, numVar, regions, pending):
+    tempName = filename + ".tmp"
+    with open(tempName, 'w') as checkpointFile:
+        print("upLCP_checkpoint", file = checkpointFile)
+        print("num_var " + str(numVar), file = checkpointFile)
+        for endPoints, basis in regions:
+            print("region " + NumToStr(endPoints[0]) + " " + NumToStr(endPoints[1]) + " " + BasisToStr(basis), file = checkpointFile)
+        for interval, basis in pending:
+            print("pending " + NumToStr(interval[0]) + " " + NumToStr(interval[1]) + " " + BasisToStr(basis), file = checkpointFile)
+        print("END", file = checkpointFile)
+    os.replace(tempName, filename)
+
+# Read a checkpoint file
+#
+# Input:    pari        --  the pari environment
+#           sys         --  the variable containing any information passed at
+#                           the command line
+#           filename    --  the name of the checkpoint file
+#           numVar      --  the number of variables present in the current
+#                           instance
+#
+# Output:   regions     --  a list of (endPoints, basis) pairs describing the
+#                           previously discovered invariancy regions
+#           pending     --  a list of (interval, basis) pairs describing the
+#                           intervals that have not yet been processed
+def ReadCheckpoint(pari, sys, filename, numVar):
+    regions = []
+    pending = []
+    complete = False
+    with open(filename) as checkpointFile:
+        lines = checkpointFile.readlines()
+    if len(lines) == 0 or lines[0].strip() != "upLCP_checkpoint":
+        sys.exit("The file " + filename + " is not a valid checkpoint file. Exiting!")
+    for line in lines[1:]:
+        vals = line.split()
+        if len(vals) == 0:
+            continue
+        if vals[0] == "num_var":
+            if int(vals[1]) != numVar:
+                sys.exit("The checkpoint file " + filename + " was created for an instance with " + vals[1] + " variables, but the current instance has " + str(numVar) + ". Exiting!")
+        elif vals[0] == "region" or vals[0] == "pending":
+            interval = [pari(vals[1]), pari(vals[2])]
+            basis = [int(b) for b in vals[3].split(",")]
+            if vals[0] == "region":
+                regions.append((interval, basis))
+            else:
+                pending.append((interval, basis))
+        elif vals[0] == "END":
+            complete = True
+            break
+        else:
+            sys.exit("Unrecognized symbol " + repr(line) + " in checkpoint file " + filename + ". Exiting!")
+    if not complete:
+        sys.exit("The checkpoint file " + filename + " is incomplete. Exiting!")
+
+    return regions, pending
@@ -15,6 +15,8 @@
 ################################################################################
 
 from matrix_manipulation import *
+from parallel_pivot import ParallelTableau
+import random
 
 # Define Functions
 
@@ -26,7 +28,7 @@ from matrix_manipulation import *
 #                               parameter space and at which we are attempting
 #                               to identify our starting basis
 def ExitWarning(logging, startingPoint):
-    logging.warnings("The Criss Cross method received an 'exit' status and has therefore failed to 'process' this instance of (mp)LCP with the parameters fixed at " +
+    logging.warning("The Criss Cross method received an 'exit' status and has therefore failed to 'process' this instance of (mp)LCP with the parameters fixed at " +
                         str(startingPoint[0:-1]) + ". Note that, as the criss cross method is guaranteed to 'process' instances of LCP in which M is a sufficient matrix, it is likely that your instance of mpLCP does not satisfy Assumption 1.1 of 'Advancing Parametric Optimization', namely, that M must be sufficient at every parameter vector in the parameter space. Nevertheless, we continue and attempt to find a starting basis using the standard Phase 1 procedure ... ")
 
 # Utilize a simple implementation of the criss cross algorithm as presented in
@@ -35,7 +37,22 @@ def ExitWarning(logging, startingPoint):
 #   problem, sufficient matrices, and the criss-cross method. Linear Algebra
 #   and Its Applications, 187, 1-14. 
 #
-# in attempt to find a starting basis.
+# in attempt to find a starting basis. The basic variable that leaves the basis
+# at each iteration is chosen by one of the following pivot rules:
+#
+#   leastIndex      --  the first row having a negative value
+#   mostNegative    --  the row having the most negative value
+#   randomized      --  the first row having a negative value, with the rows
+#                       taken in an order drawn at random (seeded by the 
+#                       starting point, so that runs are reproducible). The
+#                       partner of an exchange pivot is chosen in the same
+#                       order.
+#   hybrid          --  mostNegative for the first hybridIterations iterations,
+#                       and leastIndex afterward
+#
+# Only the least-index rule is guaranteed to terminate, so the other rules
+# switch to leastIndex (taking the rows in their natural order) if a basis is
+# ever revisited.
 #
 # Input:    pari    --  the pari environment
 #           logging --  the logging environment
@@ -49,6 +66,17 @@ def ExitWarning(logging, startingPoint):
 #           epsilon         --  a small value used to avoid numerical issues
 #           basis           --  a list indicating the basic variables of the 
 #                               previously discovered interval (if one exists)
+#           helpers         --  the PivotHelpers over which the rows of the 
+#                               tableau are spread, or None if pivots are to be
+#                               performed serially
+#           pivotRule       --  the pivot rule used (see above)
+#           hybridIterations    --  the number of iterations after which the
+#                                   hybrid rule switches to leastIndex
+#           stats           --  a dictionary whose "pivots" entry is increased
+#                               by the number of pivots performed (or None)
+#           tableau         --  a tableau to pivot on in place of gMatrix (e.g.,
+#                               a FloatTableau), evaluated at startingPoint, or
+#                               None
 #
 # Output:   basis   --  a list indicating the basic variables at the starting
 #                       solution
@@ -56,7 +84,7 @@ def ExitWarning(logging, startingPoint):
 #                       mpLCP at the current basis
 #           feasible    --  a boolean indicating whether or not the criss cross
 #                           method discovered a feasible solution to the (mp)LCP
-def CrissCross(pari, logging, numVar, gMatrix, xVar, startingPoint, epsilon, basis):
+def CrissCross(pari, logging, numVar, gMatrix, xVar, startingPoint, epsilon, basis, helpers = None, pivotRule = "leastIndex", hybridIterations = 0, stats = None, tableau = None):
     pivotRow = -1
     pivotRow2 = 0
     pivotCol = 0
@@ -67,32 +95,53 @@ def CrissCross(pari, logging, numVar, gMatrix, xVar, startingPoint, epsilon, bas
     keepGoing = True
     pivotFound = False
     originalGmatrix = [row[:] for row in gMatrix] #deep copy
+    if tableau is None and helpers is None:
+        tableau = Tableau(pari, gMatrix, xVar, startingPoint)
+    elif tableau is None:
+        tableau = ParallelTableau(pari, gMatrix, xVar, startingPoint, helpers)
     
     it = 1;
+    numPivots = 0
+    order = list(range(len(tableau)))
+    if pivotRule == "randomized":
+        random.Random(str(startingPoint[0])).shuffle(order)
+    visited = set()
     
     #Initialization -- Check if initial point is feasible. If not, enter the dummy variable
     while keepGoing:
 #        print("Iteration " + str(it))
 #        print("current basis: " + str(basis))
+        mostNegative = pivotRule == "mostNegative" or (pivotRule == "hybrid" and it <= hybridIterations)
+        if mostNegative or pivotRule == "randomized":
+            if tuple(basis) in visited:
+                pivotRule = "leastIndex"
+                mostNegative = False
+                order = list(range(len(tableau)))
+            visited.add(tuple(basis))
         pivotRow = -1
-        for i in range(len(gMatrix)):
-            val = pari.substvec(gMatrix[i][2*numVar], xVar[0:-1], startingPoint)
+        minVal = 0.0
+        for i in order:
+            val = tableau.Value(i, 2*numVar)
 #            print("RHS value " + str(i) + ": " + str(val))
-            if val < 0.0:
+            if val < minVal:
                 pivotRow = i
-#                print(str(basis[pivotRow]) + " will exit the basis.")
-                if basis[pivotRow] < numVar:
-                    pivotCol = basis[pivotRow] + numVar
-                else:
-                    pivotCol = basis[pivotRow] - numVar
-                break
+                minVal = val
+                if not mostNegative:
+                    break
 
         if pivotRow >= 0:
+#            print(str(basis[pivotRow]) + " will exit the basis.")
+            if basis[pivotRow] < numVar:
+                pivotCol = basis[pivotRow] + numVar
+            else:
+                pivotCol = basis[pivotRow] - numVar
+
             #Diagonal Pivot Check
-            val = pari.substvec(gMatrix[pivotRow][pivotCol], xVar[0:-1], startingPoint)
+            val = tableau.Value(pivotRow, pivotCol)
             if val < -epsilon:
                 basis[pivotRow] = pivotCol
-                gMatrix = matrixPivot(gMatrix, pivotRow, pivotCol)
+                tableau.Pivot(pivotRow, pivotCol)
+                numPivots += 1
 #                print("A diagonal pivot will be performed")
             elif val > epsilon:
                 ExitWarning(logging, startingPoint)
@@ -100,14 +149,14 @@ def CrissCross(pari, logging, numVar, gMatrix, xVar, startingPoint, epsilon, bas
             else:
                 #Exchange Pivot Check
                 pivotFound = False
-                for i in range(len(gMatrix)):
+                for i in order:
                     pivotRow2 = i
                     if basis[pivotRow2] < numVar:
                         pivotCol2 = basis[pivotRow2] + numVar
                     else:
                         pivotCol2 = basis[pivotRow2] - numVar
-                    val = pari.substvec(gMatrix[i][pivotCol], xVar[0:-1], startingPoint)
-                    val2 = pari.substvec(gMatrix[pivotRow][pivotCol2], xVar[0:-1], startingPoint)
+                    val = tableau.Value(i, pivotCol)
+                    val2 = tableau.Value(pivotRow, pivotCol2)
                     if val > 0.0 or val2 < 0.0:
                         if val*val2  >= 0:
                             ExitWarning(logging, startingPoint)
@@ -117,22 +166,27 @@ def CrissCross(pari, logging, numVar, gMatrix, xVar, startingPoint, epsilon, bas
                             pivotFound = True
                             basis[pivotRow] = pivotCol
                             basis[pivotRow2] = pivotCol2
-                            gMatrix = matrixPivot(gMatrix, pivotRow, pivotCol2)
-                            gMatrix = matrixPivot(gMatrix, pivotRow2, pivotCol)
-                            temp = gMatrix[pivotRow]
-                            gMatrix[pivotRow] = gMatrix[pivotRow2]
-                            gMatrix[pivotRow2] = temp
+                            tableau.Pivot(pivotRow, pivotCol2)
+                            tableau.Pivot(pivotRow2, pivotCol)
+                            tableau.Swap(pivotRow, pivotRow2)
+                            numPivots += 2
                             break
                 if not pivotFound:
                     #The instance is not feasible at the given starting point
                     feasible = False
                     keepGoing = False
-                    gMatrix = originalGmatrix
         else:
             #A feasible solution and starting basis have been found
             keepGoing = False
         it += 1
 
+    if stats is not None:
+        stats["pivots"] = stats.get("pivots", 0) + numPivots
+    if feasible:
+        gMatrix = tableau.Rows()
+    else:
+        gMatrix = originalGmatrix
+
     return basis, gMatrix, feasible
 
 
@@ -0,0 +1,416 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Distribute the partitioning of the parameter space over
+#                   several machines. A coordinator serves (interval, basis)
+#                   tasks over TCP and collects the resulting invariancy
+#                   regions. Each worker node reads the instance itself, solves
+#                   the tasks it receives using several local processes (set up
+#                   as the workers of a local run, see worker_pool.py), and
+#                   reports back. Only plain Python data (endpoints written as
+#                   strings and bases) is exchanged, so tableaux are recovered
+#                   by the workers from the bases they receive.
+#
+################################################################################
+
+from multiprocessing.managers import BaseManager
+from collections import deque
+from checkpoint import NumToStr
+from matrix_manipulation import *
+from worker_resources import *
+import worker_pool
+import threading
+import hashlib
+import logging
+import socket
+import sys
+import time
+import os
+
+
+# Define the Coordinator Class
+
+# Tasks are (taskId, interval, basis, hint, length) tuples, where hint is as
+# passed to AddTask in worker_pool.py (with the width written as a string) and
+# length is the length of the interval as a float.
+class Coordinator:
+    def __init__(self, fingerprint, numVar, timeout, largestFirst = False):
+        self.lock           = threading.Lock()
+        self.fingerprint    = fingerprint
+        self.numVar         = numVar
+        self.timeout        = timeout
+        self.largestFirst   = largestFirst
+        self.queue          = deque()
+        self.inFlight       = {}
+        self.done           = set()
+        self.regions        = []
+        self.failed         = []
+        self.lastSeen       = {}
+        self.attempts       = {}
+        self.lastContact    = time.time()
+        self.nextId         = 0
+
+    # Getters
+    def Fingerprint(self):
+        return self.fingerprint
+
+    def Timeout(self):
+        return self.timeout
+
+    def Regions(self):
+        with self.lock:
+            return list(self.regions)
+
+    def Failed(self):
+        with self.lock:
+            return list(self.failed)
+
+    # Return the regions found so far and the tasks that have not yet been
+    # completed (whether queued or in progress)
+    def Snapshot(self):
+        with self.lock:
+            pending = [(task[1], task[2]) for task in self.queue]
+            pending += [(task[1], task[2]) for node, worker, task in self.inFlight.values()]
+            return list(self.regions), pending
+
+    # Check whether every task has been completed
+    def Finished(self):
+        with self.lock:
+            return len(self.queue) == 0 and len(self.inFlight) == 0
+
+    # Return the number of tasks that have not yet been completed
+    def Outstanding(self):
+        with self.lock:
+            return len(self.queue) + len(self.inFlight)
+
+    # Return the number of seconds since any worker node was last heard from
+    # (or since the coordinator was created, if none has been heard from yet)
+    def Idle(self):
+        with self.lock:
+            return time.time() - self.lastContact
+
+    # Give up on every task that has not yet been completed, returning their
+    # (interval, basis) pairs. Results received later for these tasks are
+    # ignored.
+    def Abandon(self):
+        with self.lock:
+            tasks = list(self.queue) + [task for node, worker, task in self.inFlight.values()]
+            self.queue.clear()
+            self.inFlight.clear()
+            for task in tasks:
+                self.done.add(task[0])
+            return [(task[1], task[2]) for task in tasks]
+
+    # Add a region that was found prior to starting the coordinator
+    def AddRegion(self, endPoints, basis):
+        with self.lock:
+            self.regions.append(([NumToStr(endPoints[0]), NumToStr(endPoints[1])], list(basis)))
+
+    # Add an (interval, basis) pair to the queue. Methods whose names begin with
+    # an underscore expect the lock to be held, and are not exposed to worker
+    # nodes.
+    def AddTask(self, interval, basis):
+        with self.lock:
+            self._AddTask([NumToStr(interval[0]), NumToStr(interval[1])], basis, None, float(interval[1] - interval[0]))
+
+    def _AddTask(self, interval, basis, hint, length):
+        self.queue.append((self.nextId, interval, list(basis), hint, length))
+        self.nextId += 1
+
+    # Record contact from a worker node
+    def _Touch(self, node):
+        self.lastContact = time.time()
+        self.lastSeen[node] = self.lastContact
+
+    # Hand the next task to a worker. Returns ("task", task) if a task is
+    # available, ("wait", None) if all remaining tasks are currently being
+    # processed by other workers, and ("done", None) once every task has been
+    # completed. Tasks are handed out in the order they were created, or
+    # longest interval first.
+    def GetTask(self, node, worker):
+        with self.lock:
+            self._Touch(node)
+            if len(self.queue) > 0:
+                if self.largestFirst:
+                    task = max(self.queue, key = lambda task: task[4])
+                    self.queue.remove(task)
+                else:
+                    task = self.queue.popleft()
+                self.inFlight[task[0]] = (node, worker, task)
+                return ("task", task)
+            if len(self.inFlight) > 0:
+                return ("wait", None)
+            return ("done", None)
+
+    # Record the regions found while processing a task (the region containing
+    # its split point, unless it is a single point, and any slivers covered
+    # next to it), given as (endpoints, basis) pairs, along with any new
+    # intervals that must be processed, given as (interval, basis, hint,
+    # length) tuples. Results for tasks that have already been completed (e.g.,
+    # by another worker after the task was re-queued) are ignored.
+    def PutResult(self, node, worker, taskId, regions, children):
+        with self.lock:
+            self._Touch(node)
+            if taskId in self.done:
+                return
+            if taskId in self.inFlight:
+                del self.inFlight[taskId]
+            else:
+                for task in self.queue:
+                    if task[0] == taskId:
+                        self.queue.remove(task)
+                        break
+            self.done.add(taskId)
+            self.regions += regions
+            for interval, basis, hint, length in children:
+                self._AddTask(interval, basis, hint, length)
+
+    # Record that a task could not be processed
+    def PutFailure(self, node, worker, taskId):
+        with self.lock:
+            self._Touch(node)
+            if taskId in self.done or taskId not in self.inFlight:
+                return
+            self._Fail(taskId)
+
+    def _Fail(self, taskId):
+        taskNode, taskWorker, task = self.inFlight.pop(taskId)
+        self.done.add(taskId)
+        self.failed.append(task[1])
+
+    # Record that a worker node is still alive
+    def Heartbeat(self, node):
+        with self.lock:
+            self._Touch(node)
+
+    # Re-queue any task held by a worker process that died. As in RecoverTask
+    # in worker_pool.py, a task held by two workers that died is likely the
+    # cause, so it is recorded as failed (see PutFailure) rather than re-queued
+    # again.
+    def WorkerLost(self, node, worker):
+        with self.lock:
+            for taskId in list(self.inFlight.keys()):
+                taskNode, taskWorker, task = self.inFlight[taskId]
+                if taskNode == node and taskWorker == worker:
+                    self.attempts[taskId] = self.attempts.get(taskId, 0) + 1
+                    if self.attempts[taskId] > 1:
+                        logging.warning("The interval [" + task[1][0] + ", " + task[1][1] + "] was being processed by two workers that died. Continuing without it ...")
+                        self._Fail(taskId)
+            self._Requeue(node, worker)
+
+    # Re-queue any task held by the given worker (or by every worker of the
+    # given node if worker is None)
+    def _Requeue(self, node, worker):
+        for taskId in list(self.inFlight.keys()):
+            taskNode, taskWorker, task = self.inFlight[taskId]
+            if taskNode == node and (worker is None or taskWorker == worker):
+                del self.inFlight[taskId]
+                self.queue.appendleft(task)
+
+    # Re-queue the tasks of every node from which nothing has been heard for
+    # longer than the timeout. Returns the list of such nodes.
+    def RequeueExpired(self):
+        lost = []
+        with self.lock:
+            now = time.time()
+            for node in list(self.lastSeen.keys()):
+                if now - self.lastSeen[node] > self.timeout:
+                    self._Requeue(node, None)
+                    del self.lastSeen[node]
+                    lost.append(node)
+        return lost
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+# Define Functions
+
+# Compute a fingerprint of an instance file so that workers can check that they
+# are solving the same instance as the coordinator
+#
+# Input:    filename    --  the name of the instance file
+#
+# Output:   the fingerprint
+def InstanceFingerprint(filename):
+    with open(filename, 'rb') as instanceFile:
+        return hashlib.md5(instanceFile.read()).hexdigest()
+
+# Split an address of the form "host:port"
+#
+# Input:    address --  the address string
+#
+# Output:   a (host, port) pair
+def ParseAddress(address):
+    host, sep, port = address.rpartition(":")
+    if sep == "" or not port.isdigit():
+        sys.exit("Invalid address " + repr(address) + ", expected 'host:port'. Exiting!")
+    return (host, int(port))
+
+# Get the address on which a coordinator listens. A port alone is only served
+# on the local machine, so remote worker nodes require a host (e.g., 0.0.0.0
+# for every interface) to be given explicitly.
+#
+# Input:    address --  the address string, either "port" or "host:port"
+#
+# Output:   a (host, port) pair
+def ListenAddress(address):
+    if str(address).isdigit():
+        return ("127.0.0.1", int(address))
+    return ParseAddress(address)
+
+# Start serving a coordinator on the given address. The server runs in a
+# background thread of the calling process, so the coordinator can be accessed
+# directly by the caller.
+#
+# Input:    coordinator --  the coordinator to serve
+#           address     --  the (host, port) pair on which to listen
+#           authKey     --  the key workers must present to connect
+def StartCoordinator(coordinator, address, authKey):
+    CoordinatorManager.register('Coordinator', callable = lambda: coordinator)
+    manager = CoordinatorManager(address = address, authkey = authKey.encode())
+    server = manager.get_server()
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+
+    # Periodically re-queue the tasks of worker nodes that have gone silent
+    def Monitor():
+        while True:
+            time.sleep(max(1.0, coordinator.Timeout()/4.0))
+            for node in coordinator.RequeueExpired():
+                print("Lost contact with worker node " + str(node) + ", re-queuing its tasks")
+    threading.Thread(target = Monitor, daemon = True).start()
+
+# Connect to a coordinator
+#
+# Input:    address --  a (host, port) pair
+#           authKey --  the key required by the coordinator
+#
+# Output:   a proxy for the coordinator
+def ConnectToCoordinator(address, authKey):
+    CoordinatorManager.register('Coordinator')
+    manager = CoordinatorManager(address = address, authkey = authKey.encode())
+    manager.connect()
+    return manager.Coordinator()
+
+# Repeatedly request tasks from the coordinator and process them, until the
+# coordinator reports that all tasks are complete (or can no longer be
+# reached). Tasks are solved as by the workers of a local run (see SolveTask in
+# worker_pool.py), which must have been initialized. The tableau of the
+# previously processed task is retained so that the tableau of the next task
+# can usually be recovered with few pivots.
+#
+# Input:    address     --  the (host, port) pair of the coordinator
+#           authKey     --  the key required by the coordinator
+#           node        --  the name of this worker node
+#           worker      --  the index of this worker within its node
+def DistributedWorker(address, authKey, node, worker):
+    pari = worker_pool.pari
+    numVar = worker_pool.numVar
+    lastBasis = list(range(numVar))
+    lastMat = worker_pool.gMatrix
+    try:
+        coordinator = ConnectToCoordinator(address, authKey)
+        while True:
+            status, task = coordinator.GetTask(node, worker)
+            if status == "done":
+                break
+            if status == "wait":
+                time.sleep(0.2)
+                continue
+
+            taskId, interval, curBasis, hint, length = task
+            interval = [pari(interval[0]), pari(interval[1])]
+            if hint is not None:
+                hint = (hint[0], pari(hint[1]))
+            if worker_pool.showProgress:
+                print("Thread", os.getpid(), "is processing interval", interval)
+
+            # The LP engine and the floating point engine keep their own
+            # tableau
+            curMat = None
+            if not worker_pool.lpEngine and not worker_pool.floatEngine:
+                curMat = PivotToBasis([row[:] for row in lastMat], lastBasis, curBasis, numVar)
+            result = worker_pool.SolveTask(interval, hint, curBasis, curMat, coordinator.Outstanding())
+            worker_pool.crissCrossStats["pivots"] = 0
+            worker_pool.crissCrossStats["time"] = 0.0
+            worker_pool.crissCrossStats["slivers"] = 0
+            if result is None:
+                logging.warning("Unable to process the interval " + str(interval) + " within the maximum PARI stack size.")
+                coordinator.PutFailure(node, worker, taskId)
+                continue
+            basis, mat, rgn, lval, rval = result
+            slivers, children = worker_pool.RemainingIntervals(interval, hint, curBasis, curMat, basis, mat, lval, rval)
+            found = [([NumToStr(lval), NumToStr(rval)], list(basis))] if lval < rval else []
+            found += [([NumToStr(sliver.EndPoints()[0]), NumToStr(sliver.EndPoints()[1])], list(sliver.Basis())) for sliver in slivers]
+            children = [([NumToStr(child[0]), NumToStr(child[1])], list(basis), (childHint[0], NumToStr(childHint[1])), float(child[1] - child[0])) for child, childHint in children]
+            coordinator.PutResult(node, worker, taskId, found, children)
+            if mat is not None:
+                lastBasis = list(basis)
+                lastMat = [row[:] for row in mat]
+
+            # Exit between tasks if this process uses too much memory, so that
+            # it is replaced with a fresh process
+            if ExceedsMemoryLimit(worker_pool.maxRSS):
+                worker_pool.CloseHelpers()
+                sys.exit(RECYCLE_EXIT_CODE)
+    except (EOFError, ConnectionError, OSError):
+        # The coordinator has shut down
+        pass
+    worker_pool.CloseHelpers()
+
+# Entry point of a worker process of a worker node
+#
+# Input:    address     --  the (host, port) pair of the coordinator
+#           authKey     --  the key required by the coordinator
+#           node        --  the name of this worker node
+#           worker      --  the index of this worker within its node
+#           instance    --  the serialized instance (see SerializeInstance)
+def RunDistributedWorker(address, authKey, node, worker, instance):
+    worker_pool.InitializeWorker(instance)
+    DistributedWorker(address, authKey, node, worker)
+
+# Run a worker node: start 'numThreads' local worker processes, send heartbeats
+# to the coordinator on their behalf, and report (and replace) any worker
+# process that dies while holding a task.
+#
+# Input:    address     --  the (host, port) pair of the coordinator
+#           authKey     --  the key required by the coordinator
+#           fingerprint --  the fingerprint of the instance file
+#           numThreads  --  the number of local worker processes
+#           context     --  the multiprocessing context used to start workers
+#           instance    --  the serialized instance (see SerializeInstance)
+def RunWorkerNode(address, authKey, fingerprint, numThreads, context, instance):
+    node = socket.gethostname() + ":" + str(os.getpid())
+    try:
+        coordinator = ConnectToCoordinator(address, authKey)
+        if coordinator.Fingerprint() != fingerprint:
+            sys.exit("The instance file does not match the instance being solved by the coordinator. Exiting!")
+        heartbeat = max(0.5, coordinator.Timeout()/4.0)
+
+        def StartWorker(k):
+            proc = context.Process(target = RunDistributedWorker, args = (address, authKey, node, k, instance))
+            proc.start()
+            return proc
+        workers = {k: StartWorker(k) for k in range(numThreads)}
+
+        while len(workers) > 0:
+            time.sleep(heartbeat)
+            coordinator.Heartbeat(node)
+            for k, proc in list(workers.items()):
+                if not proc.is_alive():
+                    if proc.exitcode == 0:
+                        del workers[k]
+                    elif proc.exitcode == RECYCLE_EXIT_CODE:
+                        workers[k] = StartWorker(k)
+                    else:
+                        print("Worker process " + str(proc.pid) + " exited with code " + str(proc.exitcode) + ", re-queuing its task")
+                        coordinator.WorkerLost(node, k)
+                        workers[k] = StartWorker(k)
+    except (EOFError, ConnectionError, OSError):
+        # The coordinator has shut down
+        pass
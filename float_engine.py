@@ -0,0 +1,371 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Solve an instance of upLCP at a fixed point in the parameter
+#                   space, and find the invariancy region containing that
+#                   point, in floating point rather than exact arithmetic. Each
+#                   entry of the tableau is a ratio of polynomials in the
+#                   parameter, and the numerators and the denominator (which
+#                   is shared by the whole tableau) are stored as NumPy float64
+#                   arrays of their values at Chebyshev nodes spanning the
+#                   parameter space, so that every pivot is a handful of
+#                   vectorized operations on the entire tableau. The endpoints
+#                   of regions are found from the roots of the right hand side
+#                   using NumPy. The results are approximate, and are intended
+#                   for fast previews of large instances.
+#
+################################################################################
+
+import numpy as np
+import sys
+
+
+# Coefficients smaller than this, relative to the largest coefficient of their
+# polynomial, are treated as zero
+TRIM_TOLERANCE = 1e-12
+
+# Coefficients smaller than this multiple of the noise in a polynomial (see
+# Trim) are treated as zero
+NOISE_FACTOR = 100
+
+# Values smaller than this, relative to the largest value of their row, are
+# treated as zero when the tableau is evaluated at a point
+ZERO_TOLERANCE = 1e-10
+
+# Regions whose tableau has an estimated relative error larger than this are
+# flagged as unreliable
+ERROR_TOLERANCE = 1e-8
+
+# A basis whose denominator at a point is smaller than this, relative to the
+# largest value of the denominator, is treated as singular at the point
+SINGULAR_TOLERANCE = 1e-8
+
+# Imaginary parts smaller than this (relative to the modulus of the root) are
+# ignored when the real roots of a polynomial are computed
+IMAG_TOLERANCE = 1e-8
+
+# The number of nodes used beyond those needed to represent the polynomials of
+# the tableau. The coefficients of these extra degrees are zero in exact
+# arithmetic, so their size estimates the error of the tableau.
+EXTRA_NODES = 4
+
+
+# Define the ChebyshevGrid Class
+
+# The Chebyshev nodes (of the first kind) of an interval, at which the
+# polynomials of a FloatTableau are stored. These lie strictly inside the
+# interval, so that the entries of the tableau, which often vanish at the ends
+# of the parameter space, are seldom zero at a node. A polynomial whose degree
+# is less than the number of nodes is determined by its values at the nodes,
+# and is evaluated elsewhere by barycentric interpolation, which is stable at
+# these nodes. Its Chebyshev coefficients are a linear map of its values, and
+# its roots are those of the colleague matrix of these coefficients, which are
+# far better conditioned than roots found from monomial coefficients.
+class ChebyshevGrid:
+    def __init__(self, lo, hi, size):
+        self.lo         = lo
+        self.hi         = hi
+        self.size       = size
+        angles          = np.pi*(2*np.arange(size) + 1)/(2*size)
+        self.scaled     = np.cos(angles)
+        self.nodes      = lo + (self.scaled + 1)*(hi - lo)/2
+        self.weights    = (-1.0)**np.arange(size)*np.sin(angles)
+        self.transform  = np.linalg.inv(np.polynomial.chebyshev.chebvander(self.scaled, size - 1))
+        self.monomial   = None
+
+    # Return the weights which, applied to the values of a polynomial at the
+    # nodes, give (up to a common factor) its value at x
+    def Weights(self, x):
+        diff = x - self.nodes
+        if np.any(diff == 0):
+            return (diff == 0).astype(float)
+        return self.weights/diff
+
+    # Evaluate polynomials, given by their values at the nodes (along the first
+    # axis of an array), at x
+    def Evaluate(self, values, x):
+        weights = self.Weights(x)
+        return np.tensordot(weights, values, axes = 1)/weights.sum()
+
+    # Return the Chebyshev coefficients of polynomials, given by their values
+    # at the nodes (along the first axis of an array)
+    def Coefficients(self, values):
+        return np.tensordot(self.transform, values, axes = 1)
+
+    # Find the real roots of a polynomial, given by its (trimmed) Chebyshev
+    # coefficients, that lie strictly between two values. The roots are
+    # polished by a few steps of Newton's method.
+    def Roots(self, coefs, lo, hi):
+        if len(coefs) < 2:
+            return []
+        t = np.polynomial.chebyshev.chebroots(coefs)
+        t = t[np.abs(t.imag) <= IMAG_TOLERANCE*np.maximum(1.0, np.abs(t))].real
+        t = t[np.abs(t) <= 1 + IMAG_TOLERANCE]
+        deriv = np.polynomial.chebyshev.chebder(coefs)
+        for it in range(3):
+            slope = np.polynomial.chebyshev.chebval(t, deriv)
+            step = np.polynomial.chebyshev.chebval(t, coefs)/np.where(slope == 0, np.inf, slope)
+            t = t - step
+        roots = self.lo + (t + 1)*(self.hi - self.lo)/2
+        return sorted(float(r) for r in roots if lo < r < hi)
+
+    # Return the monomial coefficients (lowest degree first) of a polynomial in
+    # the parameter, given by its (trimmed) Chebyshev coefficients
+    def Monomial(self, coefs):
+        if self.monomial is None:
+            # Column k holds the monomial coefficients of the k-th Chebyshev
+            # polynomial of the interval
+            self.monomial = np.zeros((self.size, self.size))
+            for k in range(self.size):
+                self.monomial[:k + 1, k] = np.polynomial.Chebyshev.basis(k, domain = [self.lo, self.hi]).convert(kind = np.polynomial.Polynomial, domain = [-1, 1], window = [-1, 1]).coef
+        return self.monomial[:len(coefs), :len(coefs)].dot(coefs)
+
+
+# Define Functions
+
+# Remove the trailing Chebyshev coefficients of a polynomial that are
+# negligible. The coefficients past the largest possible degree of the
+# polynomial are zero in exact arithmetic, so their size is the level of noise
+# in all of its coefficients. Noise left in the higher coefficients would give
+# the polynomial spurious roots, and would make its monomial coefficients huge.
+#
+# Input:    coefs   --  the Chebyshev coefficients of the polynomial (lowest
+#                       degree first)
+#           degree  --  the largest possible degree of the polynomial
+#
+# Output:   the coefficients, with the negligible ones removed (at least one
+#           coefficient is kept)
+def Trim(coefs, degree):
+    scale = np.abs(coefs).max()
+    noise = np.abs(coefs[degree + 1:]).max(initial = 0.0)
+    keep = np.nonzero(np.abs(coefs[:degree + 1]) > max(TRIM_TOLERANCE*scale, NOISE_FACTOR*noise))[0]
+    if len(keep) == 0:
+        return np.zeros(1)
+    return coefs[:keep[-1] + 1]
+
+
+# Define the FloatTableau Class
+
+# A tableau whose entries are ratios of polynomials in the parameter: entry
+# (i, j) is P_ij/d, where the values of the numerators at the nodes of a
+# ChebyshevGrid are stored in the array V of shape (nodes, rows, columns), and
+# those of the denominator d in the array D. Pivots are fraction free (as in
+# Bareiss' algorithm): pivoting on (i, j) multiplies every row by the pivot
+# entry, subtracts the multiple of row i that clears column j, and divides by
+# the previous denominator, which divides the result exactly. The pivot entry
+# becomes the new denominator. Every numerator is then a minor of the original
+# tableau, whose degree is bounded by degree, and the grid has EXTRA_NODES more
+# nodes than are needed, so that the error can be estimated (see Error).
+# Entries are evaluated at a fixed point on request, and cached until the next
+# pivot. The class offers the interface of Tableau, so the criss cross method
+# can pivot on it.
+class FloatTableau:
+    def __init__(self, V, D, grid, degree, point = None):
+        self.V      = V
+        self.D      = D
+        self.grid   = grid
+        self.degree = degree
+        self.point  = point
+        self.values = None
+
+    def __len__(self):
+        return self.V.shape[1]
+
+    # Return a copy of the tableau, to be evaluated at the given point
+    def Copy(self, point = None):
+        return FloatTableau(self.V.copy(), self.D.copy(), self.grid, self.degree, point)
+
+    # Return the value of entry (i, j) at the point
+    def Value(self, i, j):
+        if self.values is None:
+            weights = self.grid.Weights(self.point)
+            self.values = np.tensordot(weights, self.V, axes = 1)/np.dot(weights, self.D)
+            self.values[np.abs(self.values) <= ZERO_TOLERANCE*np.abs(self.values).max(axis = 1, keepdims = True)] = 0.0
+        return float(self.values[i, j])
+
+    # Return whether the basis of the tableau is (numerically) singular at the
+    # point
+    def Singular(self):
+        return abs(self.grid.Evaluate(self.D, self.point)) <= SINGULAR_TOLERANCE*np.abs(self.D).max()
+
+    # Estimate the relative error of the entries at x (by default, the point)
+    # caused by rounding, which grows as the basis approaches singularity there
+    def RoundingError(self, x = None):
+        den = abs(self.grid.Evaluate(self.D, self.point if x is None else x))
+        if den == 0:
+            return np.inf
+        return float(np.finfo(float).eps*np.abs(self.D).max()/den)
+
+    # Return whether the basic solution of the tableau is feasible at the point
+    def Feasible(self):
+        return all(self.Value(i, self.V.shape[2] - 1) >= 0 for i in range(len(self)))
+
+    def Pivot(self, i, j):
+        piv = self.V[:, i, j].copy()
+        row = self.V[:, i, :].copy()
+        V = (piv[:, None, None]*self.V - self.V[:, :, j][:, :, None]*row[:, None, :])/self.D[:, None, None]
+        V[:, i, :] = row
+        V[:, :, j] = 0.0
+        V[:, i, j] = piv
+
+        # Rescale, so that the values neither overflow nor underflow
+        scale = np.abs(piv).max()
+        self.V = V/scale
+        self.D = piv/scale
+        self.values = None
+
+    def Swap(self, i, j):
+        self.V[:, [i, j]] = self.V[:, [j, i]]
+        if self.values is not None:
+            self.values[[i, j]] = self.values[[j, i]]
+
+    # Return the tableau as a list of rows, each an array of the values of the
+    # numerators of its entries at the nodes
+    def Rows(self):
+        return list(self.V.transpose(1, 2, 0))
+
+    # Estimate the relative error of the right hand side and the denominator,
+    # from the size of their Chebyshev coefficients beyond the largest
+    # possible degree. Rows of the right hand side that are negligible compared
+    # to the others are compared against the others instead.
+    def Error(self):
+        coefs = self.grid.Coefficients(np.column_stack((self.V[:, :, -1], self.D)))
+        scale = np.abs(coefs).max(axis = 0)
+        scale[:-1] = np.maximum(scale[:-1], ZERO_TOLERANCE*scale[:-1].max())
+        scale[scale == 0] = 1.0
+        return float((np.abs(coefs[self.degree + 1:]).max(axis = 0)/scale).max())
+
+
+# Build the FloatTableau of an instance from its (exact) tableau. The degree of
+# every minor of the tableau is bounded both by the sum of the degrees of its
+# rows and by that of its columns.
+#
+# Input:    pari    --  the pari environment
+#           gMatrix --  the tableau
+#           xVar    --  the array containing the pari variables used to
+#                       represent the instance's parameters
+#           interval    --  the interval spanned by the parameter space
+#
+# Output:   the FloatTableau
+def FloatTableauFromMatrix(pari, gMatrix, xVar, interval):
+    x = xVar[0]
+    degrees = np.zeros((len(gMatrix), len(gMatrix[0])), dtype = int)
+    for i in range(len(gMatrix)):
+        for j in range(len(gMatrix[i])):
+            ele = gMatrix[i][j]
+            if ele != 0:
+                if pari.poldegree(pari.denominator(ele), x) > 0:
+                    sys.exit("The entries of M(x) and q(x) must be polynomials in order to use the floating point engine. Exiting!")
+                degrees[i, j] = int(pari.poldegree(ele, x))
+    columns = np.sort(degrees.max(axis = 0))[::-1]
+    degree = int(min(degrees.max(axis = 1).sum(), columns[:len(gMatrix)].sum()))
+    grid = ChebyshevGrid(float(interval[0]), float(interval[1]), degree + 1 + EXTRA_NODES)
+    V = np.zeros((grid.size, len(gMatrix), len(gMatrix[0])))
+    for i in range(len(gMatrix)):
+        for j in range(len(gMatrix[i])):
+            ele = gMatrix[i][j]
+            if ele != 0:
+                coefs = [float(pari.polcoef(ele, k, x)) for k in range(degrees[i, j] + 1)]
+                V[:, i, j] = np.polynomial.polynomial.polyval(grid.nodes, coefs)
+    return FloatTableau(V, np.ones(grid.size), grid, degree)
+
+# Recover the FloatTableau associated with a given complementary basis by
+# pivoting on a FloatTableau associated with another complementary basis (see
+# PivotToBasis in matrix_manipulation.py)
+#
+# Input:    tableau     --  the FloatTableau associated with fromBasis (which
+#                           is changed)
+#           fromBasis   --  a list indicating the basic variable of each row
+#           toBasis     --  a list indicating the desired basic variable of
+#                           each row
+#
+# Output:   the updated FloatTableau, or None if toBasis is singular
+def FloatPivotToBasis(tableau, fromBasis, toBasis):
+    rows = [i for i in range(len(toBasis)) if toBasis[i] != fromBasis[i]]
+    free = rows[:]
+    order = {}
+    for i in rows:
+        # Pivot on the free row whose entry is largest, as in partial pivoting
+        scale = np.abs(tableau.V).max()
+        sizes = [np.abs(tableau.V[:, r, toBasis[i]]).max() for r in free]
+        if len(sizes) == 0 or max(sizes) <= ZERO_TOLERANCE*scale:
+            return None
+        r = free[int(np.argmax(sizes))]
+        tableau.Pivot(r, toBasis[i])
+        free.remove(r)
+        order[i] = r
+
+    # Move each new basic variable into the row of its complement
+    V = tableau.V.copy()
+    for i, r in order.items():
+        tableau.V[:, i] = V[:, r]
+    tableau.values = None
+
+    return tableau
+
+# Find the invariancy region of the basis of a FloatTableau that contains the
+# point at which the tableau is evaluated. Its endpoints are the roots, nearest
+# to the point, past which a basic variable becomes negative. Roots of the
+# numerators of the right hand side, and of the denominator, are considered, and
+# the sign of each basic variable past a root is checked midway to the next
+# root (or to the end of the interval).
+#
+# Input:    tableau     --  the FloatTableau
+#           interval    --  the interval to which the region is restricted
+#
+# Output:   left    --  the left endpoint (None if it is interval[0])
+#           right   --  the right endpoint (None if it is interval[1])
+def FloatEndPoints(tableau, interval):
+    point = tableau.point
+    grid = tableau.grid
+    lo, hi = float(interval[0]), float(interval[1])
+    rhs = tableau.V[:, :, -1]
+    numerators, denominator = TrimmedRHS(tableau)
+    active = np.array([np.any(numer) for numer in numerators])
+    roots = set(grid.Roots(denominator, lo, hi))
+    for numer in numerators:
+        roots.update(grid.Roots(numer, lo, hi))
+
+    # Walk away from the point, root by root, until some basic variable is
+    # negative past the root
+    left = None
+    ends = sorted([r for r in roots if r <= point], reverse = True) + [lo]
+    for k in range(len(ends) - 1):
+        past = (ends[k] + ends[k + 1])/2
+        if np.any(active & (grid.Evaluate(rhs, past)/grid.Evaluate(tableau.D, past) < 0)):
+            left = ends[k]
+            break
+    right = None
+    ends = sorted([r for r in roots if r >= point]) + [hi]
+    for k in range(len(ends) - 1):
+        past = (ends[k] + ends[k + 1])/2
+        if np.any(active & (grid.Evaluate(rhs, past)/grid.Evaluate(tableau.D, past) < 0)):
+            right = ends[k]
+            break
+    return left, right
+
+# Return the trimmed Chebyshev coefficients (see Trim) of the numerator of each
+# row of the right hand side of a FloatTableau, and of its denominator
+#
+# Input:    tableau     --  the FloatTableau
+#
+# Output:   numerators  --  a list of the coefficients of each numerator
+#           denominator --  the coefficients of the denominator
+def TrimmedRHS(tableau):
+    coefs = tableau.grid.Coefficients(np.column_stack((tableau.V[:, :, -1], tableau.D)))
+    trimmed = [Trim(coefs[:, i], tableau.degree) for i in range(coefs.shape[1])]
+    return trimmed[:-1], trimmed[-1]
+
+# Return the right hand side of a FloatTableau as the monomial coefficients
+# (lowest degree first) of the numerator of each row, and of the denominator
+#
+# Input:    tableau     --  the FloatTableau
+#
+# Output:   numerators  --  a list of the coefficients of each numerator
+#           denominator --  the coefficients of the denominator
+def FloatRHS(tableau):
+    numerators, denominator = TrimmedRHS(tableau)
+    return [tableau.grid.Monomial(numer) for numer in numerators], tableau.grid.Monomial(denominator)
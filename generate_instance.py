@@ -0,0 +1,226 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Generate random instances of the sufLCP and boQP families,
+#                   as described in
+#                   provided_instances/Details_of_Instance_Generation.pdf, and
+#                   write them in the upLCP format of the data file. Instances
+#                   are reproducible from their seed, and their size, the
+#                   density of their random matrices and the fraction of their
+#                   data that depends on the parameter can be controlled, so
+#                   that families of much larger instances than those provided
+#                   can be built.
+#
+#                   Can be run on its own as
+#
+#                   python3 generate_instance.py sufLCP|boQP -size h
+#                       (-seed s) (-density d) (-paramFraction f)
+#                       (-numInstances N) (-outDir dir)
+#
+################################################################################
+
+import numpy as np
+import sys
+import os
+
+
+# Define Functions
+
+# Draw integers by rounding values drawn from the uniform distribution
+#
+# Input:    rng     --  the NumPy random number generator
+#           lo      --  the lower end of the distribution
+#           hi      --  the upper end of the distribution
+#           shape   --  the shape of the array to draw
+#           density --  the probability with which each entry is drawn (entries
+#                       not drawn are zero)
+#
+# Output:   an array of integers
+def UniformInts(rng, lo, hi, shape, density = 1.0):
+    vals = np.rint(rng.uniform(lo, hi, shape)).astype(np.int64)
+    if density < 1.0:
+        vals[rng.random(shape) >= density] = 0
+    return vals
+
+# Generate an instance of the sufLCP family. M(x) is built from H, E, F and D(x)
+# using the techniques of Illes and Morapitiye, so that it is sufficient for all
+# 0 <= x <= 1, and q(x) is built so that the instance is feasible at x = 0.
+#
+# Input:    rng             --  the NumPy random number generator
+#           h               --  the number of variables
+#           density         --  the density of H
+#           paramFraction   --  at most paramFraction*h entries of D(x) and of
+#                               q(x) depend on x
+#
+# Output:   mConst  --  the constant part of M(x)
+#           mParam  --  the coefficient of x in M(x)
+#           qConst  --  the constant part of q(x)
+#           qParam  --  the coefficient of x in q(x)
+def SufLCP(rng, h, density, paramFraction):
+    # Choose the sizes of the blocks
+    while True:
+        n1 = int(round(rng.triangular(0, h/2, h)))
+        n2 = int(round(rng.uniform(0, h - n1)))
+        n3 = h - n1 - n2
+        if n1 > 0 and n2 > 0 and n3 <= h/2:
+            break
+    numParam = int(paramFraction*h)
+
+    H = UniformInts(rng, -2, 2, (n1, n1), density)
+    d1 = UniformInts(rng, 1, 5, n3)
+    d2 = np.zeros(n3, dtype = np.int64)
+    I = rng.choice(n3, min(n3, numParam), replace = False)
+    d2[I] = np.rint(rng.uniform(-d1[I], d1[I])).astype(np.int64)
+
+    # M(x) = [HH' E F; -E' 0 0; -F' 0 D(x)], where row 1 of E is all ones and F
+    # is the first n3 columns of the identity
+    mConst = np.zeros((h, h), dtype = np.int64)
+    mParam = np.zeros((h, h), dtype = np.int64)
+    mConst[:n1, :n1] = H @ H.T
+    mConst[0, n1:n1 + n2] = 1
+    mConst[n1:n1 + n2, 0] = -1
+    for j in range(min(n1, n3)):
+        mConst[j, n1 + n2 + j] = 1
+        mConst[n1 + n2 + j, j] = -1
+    mConst[n1 + n2:, n1 + n2:] += np.diag(d1)
+    mParam[n1 + n2:, n1 + n2:] = np.diag(d2)
+
+    # q(0) = w - M(0)z for complementary w, z >= 0
+    a1 = UniformInts(rng, 0, 5, h)
+    a2 = np.where(a1 == 0, UniformInts(rng, 0, 5, h), 0)
+    qConst = -mConst @ a1 + a2
+    qParam = np.zeros(h, dtype = np.int64)
+    J = np.nonzero(qConst > 0)[0]
+    L = rng.choice(J, min(len(J), numParam), replace = False)
+    qParam[L] = np.rint(rng.uniform(-qConst[L], qConst[L])).astype(np.int64)
+
+    return mConst, mParam, qConst, qParam
+
+# Generate an instance of the boQP family: the upLCP formulation of
+#
+#   min 1/2 y'Q(x)y + c(x)'y s.t. Ay <= b, y >= 0
+#
+# with Q(x) = (1 - x)Q1Q1' + xQ2Q2' and c(x) = (1 - x)c1 + xc2, which is convex
+# for all 0 <= x <= 1 and feasible by the choice of b.
+#
+# Input:    rng             --  the NumPy random number generator
+#           h               --  the number of variables
+#           density         --  the density of A, Q1 and Q2
+#           paramFraction   --  the fraction of the rows of Q2 (and entries of
+#                               c2) drawn independently of those of Q1 (and c1),
+#                               so that Q(x) and c(x) only depend on x in those
+#                               rows and columns
+#
+# Output:   mConst  --  the constant part of M(x)
+#           mParam  --  the coefficient of x in M(x)
+#           qConst  --  the constant part of q(x)
+#           qParam  --  the coefficient of x in q(x)
+def BoQP(rng, h, density, paramFraction):
+    # Choose the number of variables y (n) and of constraints (h - n)
+    while True:
+        n = int(round(rng.triangular(0, h/2, h)))
+        if 0 < n < h:
+            break
+    m = h - n
+
+    Q1 = UniformInts(rng, -2, 2, (n, n), density)
+    c1 = UniformInts(rng, -2, 2, n)
+    Q2 = Q1.copy()
+    c2 = c1.copy()
+    R = rng.choice(n, int(round(paramFraction*n)), replace = False)
+    Q2[R] = UniformInts(rng, -2, 2, (len(R), n), density)
+    c2[R] = UniformInts(rng, -2, 2, len(R))
+    A = UniformInts(rng, -2.5, 2.5, (m, n), density)
+    p = UniformInts(rng, 0, 2.5, n)
+
+    # M(x) = [0 -A; A' Q(x)] and q(x) = [b; c(x)]
+    mConst = np.zeros((h, h), dtype = np.int64)
+    mParam = np.zeros((h, h), dtype = np.int64)
+    mConst[:m, m:] = -A
+    mConst[m:, :m] = A.T
+    mConst[m:, m:] = Q1 @ Q1.T
+    mParam[m:, m:] = Q2 @ Q2.T - Q1 @ Q1.T
+    qConst = np.concatenate((A @ p, c1))
+    qParam = np.concatenate((np.zeros(m, dtype = np.int64), c2 - c1))
+
+    return mConst, mParam, qConst, qParam
+
+# Write an instance to a data file in upLCP format, with parameter space
+# 0 <= x <= 1
+#
+# Input:    filename    --  the name of the data file
+#           mConst      --  the constant part of M(x)
+#           mParam      --  the coefficient of x in M(x)
+#           qConst      --  the constant part of q(x)
+#           qParam      --  the coefficient of x in q(x)
+def WriteInstance(filename, mConst, mParam, qConst, qParam):
+    h = len(qConst)
+    lines = ["LCP", "", "", "h", str(h), "", "k", "1", "", "M_data"]
+    rows, cols = np.nonzero((mConst != 0) | (mParam != 0))
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        if mConst[i, j] != 0:
+            lines.append(str(i + 1) + "," + str(j + 1) + ",0," + str(mConst[i, j]))
+        if mParam[i, j] != 0:
+            lines.append(str(i + 1) + "," + str(j + 1) + ",1," + str(mParam[i, j]))
+    lines += ["", "q_data"]
+    for i in range(h):
+        if qConst[i] != 0:
+            lines.append(str(i + 1) + ",0," + str(qConst[i]))
+        if qParam[i] != 0:
+            lines.append(str(i + 1) + ",1," + str(qParam[i]))
+    lines += ["", "Param_Space", "1,1,-1", "2,1,1", "", "Param_Space_RHS", "0", "1", "", "END", ""]
+    with open(filename, 'w') as dataFile:
+        dataFile.write("\n".join(lines))
+
+
+if __name__ == '__main__':
+    families = {"SUFLCP": ("sufLCP", SufLCP, 0.2), "BOQP": ("boQP", BoQP, 1.0)}
+    if len(sys.argv) < 2 or sys.argv[1].upper() not in families:
+        sys.exit("The first argument must be the family of instances to generate, either sufLCP or boQP. Exiting!")
+    family, Generate, paramFraction = families[sys.argv[1].upper()]
+    size = 0
+    seed = 0
+    density = 1.0
+    numInstances = 1
+    outDir = "generated_instances"
+    i = 2
+    while i < len(sys.argv):
+        if sys.argv[i] == "-size":
+            i += 1
+            size = int(sys.argv[i])
+        elif sys.argv[i] == "-seed":
+            i += 1
+            seed = int(sys.argv[i])
+        elif sys.argv[i] == "-density":
+            i += 1
+            density = float(sys.argv[i])
+        elif sys.argv[i] == "-paramFraction":
+            i += 1
+            paramFraction = float(sys.argv[i])
+        elif sys.argv[i] == "-numInstances":
+            i += 1
+            numInstances = int(sys.argv[i])
+        elif sys.argv[i] == "-outDir":
+            i += 1
+            outDir = sys.argv[i]
+        else:
+            sys.exit("Invalid Command Line Argument " + str(sys.argv[i]) + ". Exiting!")
+        i += 1
+    if size < 3:
+        sys.exit("The size of the instances (-size) must be at least 3. Exiting!")
+    if not 0.0 < density <= 1.0 or not 0.0 <= paramFraction <= 1.0:
+        sys.exit("The density must be in (0, 1] and the fraction of parametric data in [0, 1]. Exiting!")
+
+    # Each instance has its own stream of random numbers, determined by the
+    # seed, the size and the instance number
+    for k in range(1, numInstances + 1):
+        rng = np.random.default_rng([seed, size, k])
+        mConst, mParam, qConst, qParam = Generate(rng, size, density, paramFraction)
+        instanceDir = os.path.join(outDir, family, "size_" + str(size), "instance" + str(k))
+        os.makedirs(instanceDir, exist_ok = True)
+        filename = os.path.join(instanceDir, "pLCP_instance.dat")
+        WriteInstance(filename, mConst, mParam, qConst, qParam)
+        print(filename + ": " + str(np.count_nonzero(mConst | mParam)) + " nonzeros in M(x), " + str(np.count_nonzero(mParam)) + " of them parametric, " + str(np.count_nonzero(qParam)) + " parametric entries of q(x)")
@@ -0,0 +1,149 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Solve an instance of upLCP only at a given set of parameter
+#                   values, computing just the invariancy regions that contain
+#                   them rather than a partition of the entire parameter space.
+#
+################################################################################
+
+from crisscross import *
+from up_inv_region import *
+from precision import ToReal
+from read_problem import VariableName
+from bisect import bisect_right
+import copy
+
+
+# Define Functions
+
+# Read the parameter values at which the solution is requested. The file should
+# contain one value per line.
+#
+# Input:    sys         --  the variable containing any information passed at
+#                           the command line
+#           filename    --  the name of the file containing the queries
+#
+# Output:   queries --  a sorted list of the requested parameter values
+def ReadQueries(sys, filename):
+    queries = []
+    with open(filename) as queryFile:
+        for line in queryFile:
+            if line.strip() == "":
+                continue
+            try:
+                queries.append(float(line.strip()))
+            except ValueError:
+                sys.exit("Unable to read the parameter value " + repr(line) + " in query file " + filename + ". Exiting!")
+    queries.sort()
+
+    return queries
+
+# Find the previously computed invariancy region containing a given point
+#
+# Input:    regions --  a list of invariancy regions sorted by left endpoint
+#           point   --  the parameter value
+#
+# Output:   the index of the region containing point, or -1 if no such region
+#           has been computed
+def FindRegion(regions, point):
+    i = bisect_right([rgn.EndPoints()[0] for rgn in regions], point) - 1
+    if i >= 0 and point <= regions[i].EndPoints()[1]:
+        return i
+    return -1
+
+# Compute the invariancy regions containing each of the given parameter values.
+# Queries are processed in increasing order and every computed region is
+# remembered, so a query lying in a known region is answered without solving.
+# Otherwise the criss cross method is started from the tableau of the most
+# recently computed region, which is usually adjacent.
+#
+# Input:    pari        --  the pari environment
+#           logging     --  the logging environment
+#           sys         --  the variable containing any information passed at
+#                           the command line
+#           numVar      --  the number of variables present in the current
+#                           instance
+#           gMatrix     --  the original tableau of the current instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           queries     --  a sorted list of parameter values
+#           epsilon     --  a small value used to avoid numerical issues
+#           paramSpace  --  the constraints defining the parameter space
+#           endPoints   --  the endpoints of the parameter space
+#           precision   --  the real precision (in bits) used by Pari
+#           refinePrecision --  the real precision (in bits) used by Pari to
+#                               recompute nearly coincident endpoints
+#           showProgress    --  a boolean indicating whether or not progress
+#                               should be displayed
+#
+# Output:   regions --  the computed invariancy regions, sorted by endpoints
+def ProcessQueries( pari,
+                    logging,
+                    sys,
+                    numVar,
+                    gMatrix,
+                    xVar,
+                    queries,
+                    epsilon,
+                    paramSpace,
+                    endPoints,
+                    precision,
+                    refinePrecision,
+                    showProgress):
+    regions = []
+    lastBasis = list(range(numVar))
+    lastMat = [row[:] for row in gMatrix]
+    numSolved = 0
+    for val in queries:
+        if val < endPoints[0] or val > endPoints[1]:
+            logging.warning("The parameter value " + str(val) + " lies outside of the parameter space and is ignored.")
+            continue
+        if FindRegion(regions, val) >= 0:
+            continue
+
+        point = [ToReal(pari, val, precision), 0]
+        basis, mat, feasible = CrissCross(pari, logging, numVar, copy.deepcopy(lastMat), xVar, point, epsilon, copy.deepcopy(lastBasis))
+        if not feasible:
+            sys.exit("Criss Cross failed. Exiting.")
+        rgn = InvRgn(pari, mat, basis, xVar, point, epsilon, paramSpace, endPoints)
+        rgn.GetExtremes(pari, precision, refinePrecision)
+        regions.insert(bisect_right([r.EndPoints()[0] for r in regions], rgn.EndPoints()[0]), rgn)
+        lastBasis = basis
+        lastMat = mat
+        numSolved += 1
+
+    if showProgress:
+        print("Answered " + str(len(queries)) + " queries by computing " + str(numSolved) + " regions")
+
+    return regions
+
+# Write the solution at each of the queried parameter values
+#
+# Input:    pari        --  the pari environment
+#           filename    --  the name of the file to write
+#           queries     --  a sorted list of parameter values
+#           regions     --  the invariancy regions (as written to the solution
+#                           file)
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           numVar      --  the number of variables present in the current
+#                           instance
+#           numRow      --  the number of constraints (only used for upLP and
+#                           upQP)
+#           probType    --  the type of problem ("LCP", "LP" or "QP")
+def WriteQueryResults(pari, filename, queries, regions, xVar, numVar, numRow, probType):
+    with open(filename, 'w') as outputFile:
+        for val in queries:
+            k = FindRegion(regions, val)
+            if k < 0:
+                continue
+            print(str(xVar[0].Str()) + " = " + repr(val) + ":\tRegion " + str(k + 1), file = outputFile)
+            rhs = regions[k].RHS()
+            basis = regions[k].Basis()
+            for i in range(len(rhs)):
+                print("\t" + VariableName(i, basis, numVar, numRow, probType) + " = " + str('%.15g'%pari.substvec(rhs[i], [xVar[0]], [val])), file = outputFile)
+            print("", file = outputFile)
@@ -0,0 +1,226 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Solve an instance of upLP at a fixed point in the parameter
+#                   space using the criss cross method on the (compact) LP
+#                   tableau, rather than on the tableau of the equivalent LCP.
+#                   The LP tableau has numRow + 1 rows and numCol + numRow + 1
+#                   columns, compared to numRow + numCol rows and
+#                   2*(numRow + numCol) + 1 columns for the LCP, so each pivot
+#                   is several times cheaper. Results are translated back to
+#                   the complementary bases (and the s/u/y/v variables) of the
+#                   LCP, so that the rest of the solver is unaffected.
+#
+################################################################################
+
+from matrix_manipulation import matrixPivot
+import random
+
+
+# Define Functions
+
+# Build the LP tableau of an instance of upLP from the tableau of its LCP
+# formulation. The LP is min c'y s.t. Ay + s = b, y,s >= 0. Columns 0 through
+# numCol - 1 of the LP tableau are associated with y, columns numCol through
+# numCol + numRow - 1 with s, and the last column is the right-hand-side. The
+# last row holds the reduced costs.
+#
+# Input:    pari        --  the pari environment
+#           gMatrix     --  the tableau of the LCP formulation of the instance
+#           numRow      --  the number of constraints
+#           numCol      --  the number of variables y
+#
+# Output:   T           --  the LP tableau associated with the slack basis
+#           lpBasis     --  a list indicating the basic column of each row of T
+def LPTableau(pari, gMatrix, numRow, numCol):
+    numVar = numRow + numCol
+    T = [[pari.zero() for j in range(numCol + numRow + 1)] for i in range(numRow + 1)]
+    for r in range(numRow):
+        for j in range(numCol):
+            T[r][j] = gMatrix[r][numVar + numRow + j]
+        T[r][numCol + r] = pari.one()
+        T[r][-1] = gMatrix[r][2*numVar]
+    for j in range(numCol):
+        T[numRow][j] = gMatrix[numRow + j][2*numVar]
+    lpBasis = [numCol + r for r in range(numRow)]
+
+    return T, lpBasis
+
+# Translate a complementary basis of the LCP formulation to a basis of the LP.
+# Row r < numRow of the LCP has basic variable s_r (index r) or u_r (index
+# numVar + r), and row numRow + j has v_j (index numRow + j) or y_j (index
+# numVar + numRow + j).
+#
+# Input:    basis   --  the complementary basis
+#           numRow  --  the number of constraints
+#           numCol  --  the number of variables y
+#
+# Output:   the set of basic columns of the LP tableau
+def LPColumns(basis, numRow, numCol):
+    numVar = numRow + numCol
+    columns = set()
+    for r in range(numRow):
+        if basis[r] == r:
+            columns.add(numCol + r)
+    for j in range(numCol):
+        if basis[numRow + j] == numVar + numRow + j:
+            columns.add(j)
+    return columns
+
+# Translate a basis of the LP to the associated complementary basis of the LCP
+# formulation (see LPColumns)
+#
+# Input:    lpBasis --  a list indicating the basic column of each row of the LP
+#                       tableau
+#           numRow  --  the number of constraints
+#           numCol  --  the number of variables y
+#
+# Output:   basis   --  the complementary basis
+def LCPBasis(lpBasis, numRow, numCol):
+    numVar = numRow + numCol
+    columns = set(lpBasis)
+    basis = []
+    for r in range(numRow):
+        basis.append(r if numCol + r in columns else numVar + r)
+    for j in range(numCol):
+        basis.append(numVar + numRow + j if j in columns else numRow + j)
+    return basis
+
+# Compute the values of the basic variables of the LCP formulation. Basic
+# variables of the LP (y and s) take their values from the right-hand-side,
+# while the duals u_r and v_j of nonbasic s_r and y_j equal their reduced
+# costs.
+#
+# Input:    T       --  the LP tableau
+#           lpBasis --  a list indicating the basic column of each row of T
+#           numRow  --  the number of constraints
+#           numCol  --  the number of variables y
+#
+# Output:   rhs     --  the value of the basic variable of each row of the LCP,
+#                       as a function of the parameter
+def LCPValues(T, lpBasis, numRow, numCol):
+    value = {}
+    for r in range(numRow):
+        value[lpBasis[r]] = T[r][-1]
+    rhs = []
+    for r in range(numRow):
+        rhs.append(value.get(numCol + r, T[numRow][numCol + r]))
+    for j in range(numCol):
+        rhs.append(value.get(j, T[numRow][j]))
+    return rhs
+
+# Recover the LP tableau associated with a given basis by pivoting from the
+# tableau associated with another basis
+#
+# Input:    T           --  the LP tableau associated with lpBasis
+#           lpBasis     --  a list indicating the basic column of each row of T
+#           columns     --  the set of desired basic columns
+#
+# Output:   T           --  the updated tableau, or None if the desired basis is
+#                           singular
+#           lpBasis     --  the updated list of basic columns
+def LPPivotToBasis(T, lpBasis, columns):
+    lpBasis = lpBasis[:]
+    for k in sorted(columns - set(lpBasis)):
+        found = False
+        for r in range(len(lpBasis)):
+            if lpBasis[r] not in columns and T[r][k] != 0:
+                T = matrixPivot(T, r, k)
+                lpBasis[r] = k
+                found = True
+                break
+        if not found:
+            return None, lpBasis
+
+    return T, lpBasis
+
+# Use the least-index criss cross method for linear programming, as presented
+# in
+#
+#   Terlaky, T. (1985). A convergent criss-cross method. Optimization, 16(5),
+#   683-690.
+#
+# to find an optimal basis of the LP at a fixed point in the parameter space.
+# The infeasible variable that enters or leaves the basis is chosen by the same
+# pivot rules as in CrissCross: "leastIndex", "mostNegative" (the variable
+# whose value or reduced cost is most negative), "randomized" (least index with
+# the columns taken in an order drawn at random, seeded by the point) and
+# "hybrid" (mostNegative for the first hybridIterations iterations, then
+# leastIndex). The rules other than leastIndex switch to it (taking the
+# columns in their natural order) if a basis is revisited.
+#
+# Input:    pari    --  the pari environment
+#           T       --  the LP tableau associated with lpBasis
+#           lpBasis --  a list indicating the basic column of each row of T
+#           xVar    --  the array containing the pari variables used to
+#                       represent the instance's parameters
+#           point   --  the point in the parameter space
+#           pivotRule       --  the pivot rule used (see above)
+#           hybridIterations    --  the number of iterations after which the
+#                                   hybrid rule switches to leastIndex
+#           stats   --  a dictionary whose "pivots" entry is increased by the
+#                       number of pivots performed (or None)
+#
+# Output:   lpBasis     --  the basic columns of the final tableau
+#           T           --  the final tableau
+#           feasible    --  a boolean indicating whether or not an optimal basis
+#                           was found
+def LPCrissCross(pari, T, lpBasis, xVar, point, pivotRule = "leastIndex", hybridIterations = 0, stats = None):
+    lpBasis = lpBasis[:]
+    numRow = len(lpBasis)
+    numCols = len(T[0]) - 1
+    order = list(range(numCols))
+    if pivotRule == "randomized":
+        random.Random(str(point[0])).shuffle(order)
+    visited = set()
+    it = 1
+    while True:
+        mostNegative = pivotRule == "mostNegative" or (pivotRule == "hybrid" and it <= hybridIterations)
+        if mostNegative or pivotRule == "randomized":
+            if tuple(lpBasis) in visited:
+                pivotRule = "leastIndex"
+                mostNegative = False
+                order = list(range(numCols))
+            visited.add(tuple(lpBasis))
+        it += 1
+        rowOf = {lpBasis[r]: r for r in range(numRow)}
+        pivotVar = -1
+        minVal = 0.0
+        for k in order:
+            if k in rowOf:
+                val = pari.substvec(T[rowOf[k]][-1], xVar[0:-1], point)
+            else:
+                val = pari.substvec(T[numRow][k], xVar[0:-1], point)
+            if val < minVal:
+                pivotVar = k
+                minVal = val
+                if not mostNegative:
+                    break
+        if pivotVar < 0:
+            return lpBasis, T, True
+        if stats is not None:
+            stats["pivots"] = stats.get("pivots", 0) + 1
+
+        if pivotVar in rowOf:
+            # A primal infeasible basic variable leaves the basis
+            r = rowOf[pivotVar]
+            for k in order:
+                if k not in rowOf and pari.substvec(T[r][k], xVar[0:-1], point) < 0.0:
+                    T = matrixPivot(T, r, k)
+                    lpBasis[r] = k
+                    break
+            else:
+                return lpBasis, T, False
+        else:
+            # A dual infeasible nonbasic variable enters the basis
+            for k in order:
+                if k in rowOf and pari.substvec(T[rowOf[k]][pivotVar], xVar[0:-1], point) > 0.0:
+                    r = rowOf[k]
+                    T = matrixPivot(T, r, pivotVar)
+                    lpBasis[r] = pivotVar
+                    break
+            else:
+                return lpBasis, T, False
@@ -61,3 +61,73 @@ def ExchangePivot(M, i, iComp, j, jComp, parallel):
 
 
 
+
+
+# Recover the tableau associated with a given complementary basis by 
+# performing principal pivots on a tableau associated with another complementary
+# basis. Only rows in which the two bases differ are pivoted. Here it is assumed
+# that the basic variable of row i is always either w_i or z_i, as is 
+# maintained by the criss cross method.
+#
+# Input:    M           --  the tableau associated with fromBasis
+#           fromBasis   --  a list indicating the basic variable of each row of 
+#                           M
+#           toBasis     --  a list indicating the desired basic variable of 
+#                           each row
+#           numVar      --  the number of variables present in the current 
+#                           instance
+#
+# Output:   M   --  the updated matrix, or None if toBasis is singular
+def PivotToBasis(M, fromBasis, toBasis, numVar):
+    rows = [i for i in range(len(toBasis)) if toBasis[i] != fromBasis[i]]
+    free = rows[:]
+    order = {}
+    for i in rows:
+        found = False
+        for r in free:
+            if M[r][toBasis[i]] != 0:
+                M = matrixPivot(M, r, toBasis[i])
+                free.remove(r)
+                order[i] = r
+                found = True
+                break
+        if not found:
+            return None
+    
+    # Move each new basic variable into the row of its complement
+    oldRows = M[:]
+    for i, r in order.items():
+        M[i] = oldRows[r]
+        
+    return(M)
+
+
+# Define the Tableau Class
+
+# A tableau stored as a list of rows, on which the criss cross method performs
+# its pivots. Entries are evaluated at a fixed point in the parameter space on
+# request. (See ParallelTableau for a tableau whose rows are spread over helper
+# processes.)
+class Tableau:
+    def __init__(self, pari, M, xVar, point):
+        self.pari   = pari
+        self.M      = M
+        self.xVar   = xVar
+        self.point  = point
+
+    def __len__(self):
+        return len(self.M)
+
+    # Return the value of entry (i, j) at the point
+    def Value(self, i, j):
+        return self.pari.substvec(self.M[i][j], self.xVar[0:-1], self.point)
+
+    def Pivot(self, i, j):
+        self.M = matrixPivot(self.M, i, j)
+
+    def Swap(self, i, j):
+        self.M[i], self.M[j] = self.M[j], self.M[i]
+
+    # Return the tableau as a list of rows
+    def Rows(self):
+        return self.M
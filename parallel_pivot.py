@@ -0,0 +1,212 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Spread the rows of a tableau over several helper processes
+#                   so that the row updates of each pivot are performed in
+#                   parallel. This shortens the solution of a single interval,
+#                   which matters when there are fewer intervals waiting to be
+#                   processed than there are available threads (e.g., at the
+#                   start and end of a run).
+#
+################################################################################
+
+from cypari2 import Pari
+from precision import SetPrecision, ToReal, ExactStr
+from worker_resources import ConfigureStack
+from matrix_manipulation import Tableau
+
+
+# Number of serial pivots after which the rows of a tableau are spread over the
+# helpers. Criss cross solves started from the basis of a neighboring region
+# usually need only a few pivots, which are not worth the cost of sending the
+# tableau to the helpers.
+PARALLEL_AFTER = 5
+
+
+# Define Functions
+
+# Main loop of a helper process. The helper holds a block of rows of a tableau
+# and performs the operations requested by the process owning the tableau. All
+# entries are exchanged as strings. The point at which entries are evaluated is
+# sent exactly (see ExactStr), together with the precision of each of its real
+# entries, so that the helper evaluates at the same point as the owner.
+#
+# Input:    conn            --  the helper's end of the connection to the owner
+#           names           --  the names of the pari variables used to
+#                               represent the instance's parameters
+#           precision       --  the real precision (in bits) used by Pari
+#           stackSize       --  the initial size (in bytes) of the PARI stack
+#           stackSizeMax    --  the maximum size (in bytes) of the PARI stack
+def PivotHelper(conn, names, precision, stackSize, stackSizeMax):
+    pari = Pari()
+    SetPrecision(pari, precision)
+    ConfigureStack(pari, stackSize, stackSizeMax)
+    # Create the parameters first so that their priorities match those in the
+    # owner
+    xVar = [pari(name) for name in names]
+    rows = []
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request[0] == "load":
+            rows = [[pari(val) for val in row] for row in request[1]]
+        elif request[0] == "normalize":
+            r, j = request[1], request[2]
+            temp = rows[r][j]
+            rows[r] = [pari.one() if k == j else rows[r][k]/temp for k in range(len(rows[r]))]
+            conn.send([str(val) for val in rows[r]])
+        elif request[0] == "update":
+            pivotRow = [pari(val) for val in request[1]]
+            j, skip = request[2], request[3]
+            for r in range(len(rows)):
+                if r != skip:
+                    temp2 = rows[r][j]
+                    if temp2 != 0:
+                        for col in range(len(rows[r])):
+                            rows[r][col] -= temp2*pivotRow[col]
+        elif request[0] == "column":
+            point = [ToReal(pari, val, bits) if bits > 0 else pari(val) for val, bits in request[2]]
+            conn.send([str(pari.substvec(row[request[1]], xVar[0:-1], point)) for row in rows])
+        elif request[0] == "row":
+            point = [ToReal(pari, val, bits) if bits > 0 else pari(val) for val, bits in request[2]]
+            conn.send([str(pari.substvec(val, xVar[0:-1], point)) for val in rows[request[1]]])
+        elif request[0] == "get":
+            conn.send([[str(val) for val in row] for row in rows])
+        elif request[0] == "stop":
+            break
+
+
+# Define the PivotHelpers Class
+
+# A set of helper processes, started as they are first needed and kept until
+# Close is called
+class PivotHelpers:
+    def __init__(self, context, xVar, precision, stackSize, stackSizeMax):
+        self.context    = context
+        self.args       = ([str(x) for x in xVar], precision, stackSize, stackSizeMax)
+        self.procs      = []
+        self.conns      = []
+        self.active     = 0
+
+    # Set the number of helpers used by the next tableau, starting more helper
+    # processes if needed
+    def Use(self, num):
+        while len(self.procs) < num:
+            conn, child = self.context.Pipe()
+            proc = self.context.Process(target = PivotHelper, args = (child,) + self.args, daemon = True)
+            proc.start()
+            child.close()
+            self.procs.append(proc)
+            self.conns.append(conn)
+        self.active = num
+
+    def Connections(self):
+        return self.conns[:self.active]
+
+    def Close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+        for proc in self.procs:
+            proc.join()
+        self.procs = []
+        self.conns = []
+        self.active = 0
+
+
+# Define the ParallelTableau Class
+
+# A tableau on which the criss cross method performs its pivots (with the same
+# interface as Tableau). The tableau starts out stored locally. After
+# PARALLEL_AFTER pivots its rows are split into contiguous blocks, one per
+# helper. A pivot then only requires the pivot row to be normalized by the
+# helper holding it and sent to every helper, which update their own rows
+# simultaneously. Rows are swapped by relabeling them, and evaluated entries are
+# fetched a column (or row) at a time and cached until the next pivot.
+class ParallelTableau(Tableau):
+    def __init__(self, pari, M, xVar, point, helpers):
+        Tableau.__init__(self, pari, M, xVar, point)
+        self.helpers    = helpers
+        self.conns      = []
+        self.location   = []
+        self.numPivots  = 0
+        self.columns    = {}
+        self.rowValues  = {}
+        self.lastMiss   = -1
+        self.pointStr   = [(ExactStr(pari, pari(val)), int(pari.bitprecision(val)) if pari(val).type() == "t_REAL" else 0) for val in point]
+
+    def __len__(self):
+        if len(self.conns) == 0:
+            return len(self.M)
+        return len(self.location)
+
+    # Send the rows of the tableau to the helpers
+    def Distribute(self):
+        self.conns = self.helpers.Connections()
+        n = len(self.M)
+        size = (n + len(self.conns) - 1)//len(self.conns)
+        self.location = [(i//size, i % size) for i in range(n)]
+        for h in range(len(self.conns)):
+            self.conns[h].send(("load", [[str(val) for val in row] for row in self.M[h*size:(h + 1)*size]]))
+        self.M = None
+
+    def Value(self, i, j):
+        if len(self.conns) == 0:
+            return Tableau.Value(self, i, j)
+        if j in self.columns:
+            return self.columns[j][i]
+        if i in self.rowValues:
+            return self.rowValues[i][j]
+        if self.lastMiss == i:
+            # Several entries of this row are needed (e.g., when searching for
+            # an exchange pivot), so fetch the entire row
+            h, r = self.location[i]
+            self.conns[h].send(("row", r, self.pointStr))
+            self.rowValues[i] = [self.pari(val) for val in self.conns[h].recv()]
+            return self.rowValues[i][j]
+        self.lastMiss = i
+        for conn in self.conns:
+            conn.send(("column", j, self.pointStr))
+        blocks = [conn.recv() for conn in self.conns]
+        self.columns[j] = [self.pari(blocks[h][r]) for h, r in self.location]
+        return self.columns[j][i]
+
+    def Pivot(self, i, j):
+        self.numPivots += 1
+        if len(self.conns) == 0:
+            Tableau.Pivot(self, i, j)
+            if self.numPivots >= PARALLEL_AFTER and len(self.helpers.Connections()) > 1:
+                self.Distribute()
+            return
+        self.columns = {}
+        self.rowValues = {}
+        self.lastMiss = -1
+        h, r = self.location[i]
+        self.conns[h].send(("normalize", r, j))
+        pivotRow = self.conns[h].recv()
+        for k in range(len(self.conns)):
+            self.conns[k].send(("update", pivotRow, j, r if k == h else -1))
+
+    def Swap(self, i, j):
+        if len(self.conns) == 0:
+            Tableau.Swap(self, i, j)
+            return
+        self.location[i], self.location[j] = self.location[j], self.location[i]
+        for values in self.columns.values():
+            values[i], values[j] = values[j], values[i]
+        self.rowValues = {}
+
+    def Rows(self):
+        if len(self.conns) == 0:
+            return self.M
+        for conn in self.conns:
+            conn.send(("get",))
+        blocks = [conn.recv() for conn in self.conns]
+        return [[self.pari(val) for val in blocks[h][r]] for h, r in self.location]
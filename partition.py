@@ -0,0 +1,67 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Post-process the partition of the parameter space so that
+#                   it is stored and written in a canonical, minimal form.
+#
+################################################################################
+
+
+# Define Functions
+
+# Sort the invariancy regions by their endpoints, discard degenerate regions
+# (those consisting of a single point), and merge adjacent (or overlapping)
+# regions that share the same basis. Since the basis determines the tableau,
+# two such regions are described by identical expressions and only their
+# endpoints need to be combined.
+#
+# Input:    regions --  a list of invariancy regions
+#           epsilon --  a small value used to decide whether two regions are
+#                       adjacent
+#
+# Output:   merged  --  the sorted list of merged, non-degenerate regions
+def MergeRegions(regions, epsilon):
+    merged = []
+    for rgn in sorted(regions, key = lambda r: (r.EndPoints()[0], r.EndPoints()[1])):
+        point = rgn.EndPoints()
+        if point[0] >= point[1]:
+            continue
+        if len(merged) > 0:
+            last = merged[-1]
+            if last.Basis() == rgn.Basis() and point[0] - last.EndPoints()[1] <= epsilon:
+                if point[1] > last.EndPoints()[1]:
+                    last.EndPoints()[1] = point[1]
+                if rgn.FloatError() is not None:
+                    last.floatError = max(last.FloatError() or 0.0, rgn.FloatError())
+                continue
+        merged.append(rgn)
+
+    return merged
+
+# Find the portions of an interval that are covered neither by the given
+# regions nor by the given excluded intervals (e.g., those already reported as
+# failed)
+#
+# Input:    regions     --  a list of invariancy regions
+#           endPoints   --  the ends of the interval that was partitioned
+#           epsilon     --  a small value below which gaps are ignored
+#           excluded    --  a list of intervals to treat as covered
+#
+# Output:   gaps    --  the sorted list of uncovered intervals
+def UncoveredIntervals(regions, endPoints, epsilon, excluded = []):
+    covered = sorted([rgn.EndPoints() for rgn in regions] + list(excluded), key = lambda point: (point[0], point[1]))
+    gaps = []
+    left = endPoints[0]
+    for point in covered:
+        if point[0] - left > epsilon:
+            gaps.append([left, min(point[0], endPoints[1])])
+        if point[1] > left:
+            left = point[1]
+        if left >= endPoints[1]:
+            break
+    if endPoints[1] - left > epsilon:
+        gaps.append([left, endPoints[1]])
+    return gaps
@@ -0,0 +1,48 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Manage the real precision used by Pari when evaluating the
+#                   tableau at fixed parameter values and when computing the 
+#                   endpoints of invariancy regions.
+#
+################################################################################
+
+
+# Define Functions
+
+# Set the default real precision of the given pari instance
+#
+# Input:    pari        --  the pari environment
+#           precision   --  the desired precision (in bits)
+def SetPrecision(pari, precision):
+    pari.set_real_precision_bits(precision)
+
+# Convert a value to a Pari real number having the given precision. This is
+# used so that points at which the tableau is evaluated are always Pari reals
+# of a known precision, rather than a mixture of Python floats and Pari reals.
+#
+# Input:    pari        --  the pari environment
+#           val         --  the value to convert (a Python number or a Pari 
+#                           number)
+#           precision   --  the desired precision (in bits)
+#
+# Output:   a Pari real equal to val at the given precision
+def ToReal(pari, val, precision):
+    return pari.bitprecision(pari(val)*pari.bitprecision(pari('1.'), precision), precision)
+
+# Write a Pari number as a string from which it can be recovered exactly. Reals
+# are written as the rational number they represent (their decimal expansion
+# is rounded), so ToReal recovers the same real from the string.
+#
+# Input:    pari    --  the pari environment
+#           val     --  the Pari number
+#
+# Output:   the string representation of val
+def ExactStr(pari, val):
+    if val.type() != "t_REAL" or val == 0:
+        return str(val)
+    shift = pari.bitprecision(val) - pari.exponent(val) - 1
+    return str(pari.truncate(pari.shift(val, shift))/pari(2)**shift)
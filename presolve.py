@@ -0,0 +1,209 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Shrink an instance before it is solved. The parameter space
+#                   is reduced to the interval it actually describes, and
+#                   variables whose values are known over the entire parameter
+#                   space are removed from the tableau. A postsolve map restores
+#                   the removed variables in the regions of the final solution.
+#
+################################################################################
+
+from cypari2 import PariError
+
+
+# Define Functions
+
+# Compute the interval described by the constraints of the parameter space. Each
+# constraint has the form a*x + c <= b.
+#
+# Input:    pari        --  the pari environment
+#           sys         --  the variable containing any information passed at
+#                           the command line
+#           paramSpace  --  the constraints defining the parameter space
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#
+# Output:   lo          --  the lower end of the parameter space
+#           hi          --  the upper end of the parameter space
+def ParamInterval(pari, sys, paramSpace, xVar):
+    lo = None
+    hi = None
+    for lhs, rhs in paramSpace:
+        a = pari.polcoef(lhs, 1, xVar[0])
+        bound = rhs - pari.polcoef(lhs, 0, xVar[0])
+        if a > 0:
+            hi = bound/a if hi is None else min(hi, bound/a)
+        elif a < 0:
+            lo = bound/a if lo is None else max(lo, bound/a)
+        elif bound < 0:
+            sys.exit("The parameter space is empty. Exiting!")
+    if lo is None or hi is None:
+        sys.exit("The parameter space is unbounded. Exiting!")
+    if lo > hi:
+        sys.exit("The parameter space is empty. Exiting!")
+    return lo, hi
+
+# Determine the sign of a rational function over an interval
+#
+# Input:    pari    --  the pari environment
+#           f       --  the rational function
+#           x       --  the pari variable in which f is written
+#           lo      --  the lower end of the interval
+#           hi      --  the upper end of the interval
+#
+# Output:   1 if f is positive over the interval, -1 if f is negative over the
+#           interval, 0 if f is identically zero and None otherwise
+def SignOver(pari, f, x, lo, hi):
+    if f == 0:
+        return 0
+    try:
+        for g in [pari.numerator(f), pari.denominator(f)]:
+            if pari.poldegree(g, x) > 0 and len(pari.polrootsreal(g, [lo, hi])) > 0:
+                return None
+        val = pari.substvec(f, [x], [(lo + hi)/2])
+        if val.type() not in ["t_INT", "t_FRAC", "t_REAL"]:
+            return None
+    except PariError:
+        return None
+    return 1 if val > 0 else -1
+
+# Presolve an instance. The parameter space is replaced by the two constraints
+# defining its actual interval. Then, variable i is removed (with w_i basic and
+# z_i = 0 over the entire parameter space) whenever either
+#
+#   (1) q_i is positive over the parameter space and every entry of row i of M
+#       is nonnegative over the parameter space (so that w_i > 0), or
+#   (2) q_i, row i of M and column i of M are all zero (so that w_i = 0 and z_i
+#       does not affect any other variable).
+#
+# Since z_i = 0, column i of M is dropped with row i, which may allow further
+# variables to be removed. For upLP and upQP, (1) removes constraints that can
+# never be binding and variables that are zero at every optimum, so the
+# reduced instance has the same structure as the original.
+#
+# Input:    pari        --  the pari environment
+#           sys         --  the variable containing any information passed at
+#                           the command line
+#           numVar      --  the number of variables present in the instance
+#           gMatrix     --  the tableau of the instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           paramSpace  --  the constraints defining the parameter space
+#           numRow      --  the number of constraints (only used if the instance
+#                           is an upLP or upQP)
+#           numCol      --  the number of variables y (only used if the instance
+#                           is an upLP or upQP)
+#
+# Output:   numVar      --  the number of variables of the reduced instance
+#           gMatrix     --  the tableau of the reduced instance
+#           paramSpace  --  the constraints defining the reduced parameter space
+#           numRow      --  the number of constraints of the reduced instance
+#           numCol      --  the number of variables y of the reduced instance
+#           postsolve   --  the Postsolve object used to restore the removed
+#                           variables
+def Presolve(pari, sys, numVar, gMatrix, xVar, paramSpace, numRow, numCol):
+    x = xVar[0]
+    lo, hi = ParamInterval(pari, sys, paramSpace, xVar)
+    reducedSpace = [[-1*x, -lo], [x, hi]]
+
+    signs = {}
+    def Sign(i, j):
+        if (i, j) not in signs:
+            signs[(i, j)] = SignOver(pari, gMatrix[i][j], x, lo, hi)
+        return signs[(i, j)]
+
+    # The tableau stores -M, so row i of M is nonnegative when the entries of
+    # row i of the tableau are nonpositive
+    fixed = set()
+    changed = True
+    while changed:
+        changed = False
+        for i in range(numVar):
+            if i in fixed or len(fixed) == numVar - 1:
+                continue
+            kept = [j for j in range(numVar) if j not in fixed]
+            sign = Sign(i, 2*numVar)
+            if sign == 1 and all(Sign(i, numVar + j) in [0, -1] for j in kept):
+                fixed.add(i)
+                changed = True
+            elif sign == 0 and all(gMatrix[i][numVar + j] == 0 and gMatrix[j][numVar + i] == 0 for j in kept):
+                fixed.add(i)
+                changed = True
+
+    keep = [i for i in range(numVar) if i not in fixed]
+    reduced = [[gMatrix[i][j] for j in keep] + [gMatrix[i][numVar + j] for j in keep] + [gMatrix[i][2*numVar]] for i in keep]
+    postsolve = Postsolve(numVar, gMatrix, paramSpace, numRow, numCol, keep)
+
+    return len(keep), reduced, reducedSpace, len([i for i in keep if i < numRow]), len([i for i in keep if numRow <= i < numRow + numCol]), postsolve
+
+
+# Define the Postsolve Class
+
+# The map between the variables of an instance and those of its presolved form.
+# Variable p of the presolved instance is variable keep[p] of the original.
+class Postsolve:
+    def __init__(self, numVar, gMatrix, paramSpace, numRow, numCol, keep):
+        self.numVar     = numVar
+        self.gMatrix    = gMatrix
+        self.paramSpace = paramSpace
+        self.numRow     = numRow
+        self.numCol     = numCol
+        self.keep       = keep
+        self.position   = {keep[p]: p for p in range(len(keep))}
+
+    # Return the size, tableau and parameter space of the original instance
+    def Original(self):
+        return self.numVar, self.gMatrix, self.paramSpace, self.numRow, self.numCol
+
+    def NumRemoved(self):
+        return self.numVar - len(self.keep)
+
+    # Translate a basis of the original instance to the presolved instance.
+    # Return None if a removed variable is not basic through w.
+    def Reduce(self, basis):
+        n = len(self.keep)
+        reduced = [-1]*n
+        for i in range(self.numVar):
+            if i not in self.position:
+                if basis[i] != i:
+                    return None
+            elif basis[i] < self.numVar:
+                reduced[self.position[i]] = self.position[basis[i]]
+            else:
+                reduced[self.position[i]] = n + self.position[basis[i] - self.numVar]
+        return reduced
+
+    # Translate a basis of the presolved instance, and the values of its basic
+    # variables, to the original instance. Each removed w_i is basic with value
+    # q_i + (row i of M)z.
+    #
+    # Input:    basis   --  the basis of the presolved instance
+    #           rhs     --  the values of the basic variables
+    #
+    # Output:   full        --  the basis of the original instance
+    #           fullRHS     --  the values of its basic variables
+    def Expand(self, basis, rhs):
+        n = len(self.keep)
+        full = list(range(self.numVar))
+        fullRHS = [self.gMatrix[i][2*self.numVar] for i in range(self.numVar)]
+        z = {}
+        for p in range(n):
+            if basis[p] < n:
+                full[self.keep[p]] = self.keep[basis[p]]
+            else:
+                full[self.keep[p]] = self.numVar + self.keep[basis[p] - n]
+                z[self.keep[basis[p] - n]] = rhs[p]
+            fullRHS[self.keep[p]] = rhs[p]
+        for i in range(self.numVar):
+            if i not in self.position:
+                for j, val in z.items():
+                    fullRHS[i] -= self.gMatrix[i][self.numVar + j]*val
+        return full, fullRHS
+
+    # Restore the removed variables in an invariancy region
+    def Region(self, rgn):
+        rgn.basis, rgn.rhs = self.Expand(rgn.Basis(), rgn.RHS())
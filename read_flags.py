@@ -36,14 +36,160 @@ def PrintInvalidParameterMessage(flag, curValue, validValues, logging):
 #           showProgress    --  a boolean indicating whether or not information
 #                               about the intervals being processed should be 
 #                               displayed throughout execution
+#           checkpointFile  --  the name of the file to which checkpoints should
+#                               be written (an empty string disables
+#                               checkpointing)
+#           checkpointInterval  --  the number of seconds between checkpoints
+#           resumeFile      --  the name of a checkpoint file from which the
+#                               partitioning should be resumed (an empty string
+#                               indicates a fresh start)
+#           precision       --  the real precision (in bits) used by Pari for 
+#                               sign tests and root finding
+#           refinePrecision --  the real precision (in bits) used by Pari to
+#                               recompute endpoints that are too close to be
+#                               reliably compared at the default precision
+#           warmStartFile   --  the name of a previously computed solution file
+#                               whose bases should be used to seed the
+#                               partitioning (an empty string indicates a fresh
+#                               start)
+#           queryFile       --  the name of a file containing parameter values at
+#                               which the solution is requested (an empty 
+#                               string indicates that the entire parameter space
+#                               should be partitioned)
+#           subInterval     --  a list containing the lower and upper bounds of
+#                               the portion of the parameter space to partition
+#                               (an empty list indicates the entire parameter
+#                               space)
+#           coordinatorAddress  --  the port ("port") or address ("host:port")
+#                                   on which to serve tasks to worker nodes (an
+#                                   empty string indicates that the problem
+#                                   should be solved locally)
+#           workerAddress   --  the "host:port" address of a coordinator to
+#                               which this process should connect as a worker
+#                               node (an empty string indicates that this 
+#                               process is not a worker node)
+#           authKey         --  the key used to authenticate worker nodes
+#           workerTimeout   --  the number of seconds after which the tasks of
+#                               an unresponsive worker node are re-queued
+#           coordinatorTimeout  --  the number of seconds without contact from
+#                                   any worker node after which a coordinator
+#                                   gives up on the remaining tasks (0
+#                                   indicates no limit)
+#           stackSize       --  the initial size (in bytes) of the PARI stack of
+#                               each worker
+#           stackSizeMax    --  the maximum size (in bytes) to which the PARI
+#                               stack of each worker may grow
+#           maxRSS          --  the resident memory (in bytes) above which a
+#                               worker is replaced by a fresh process between 
+#                               tasks (0 indicates no limit)
+#           startMethod     --  the method used to start worker processes 
+#                               ("fork", "spawn" or "forkserver"; an empty
+#                               string indicates the platform default)
+#           parallelPivot   --  the number of variables from which the pivots
+#                               of a single interval may be spread over helper
+#                               processes (0 indicates never)
+#           splitStrategy   --  the strategy used to choose the point at which
+#                               an interval is solved ("midpoint", "adjacent" 
+#                               or "predict")
+#           largestFirst    --  a boolean indicating whether or not the longest
+#                               pending interval should be processed first
+#           lpEngine        --  a boolean indicating whether or not instances of
+#                               upLP should be solved on the LP tableau rather
+#                               than on the tableau of the equivalent LCP
+#           presolve        --  a boolean indicating whether or not the instance
+#                               should be presolved
+#           verify          --  a boolean indicating whether or not the solution
+#                               file should be verified once it is written
+#           pivotRule       --  the rule used by the criss cross method to 
+#                               choose the variable leaving the basis 
+#                               ("leastIndex", "mostNegative", "randomized" or
+#                               "hybrid")
+#           hybridIterations    --  the number of iterations after which the
+#                                   hybrid rule switches to leastIndex (0
+#                                   indicates the number of variables)
+#           rhsFile         --  the name of a file holding additional right
+#                               hand sides q(x) to solve for, along with that of
+#                               the data file (an empty string indicates that
+#                               only the data file's right hand side is solved
+#                               for)
+#           timeLimit       --  the number of seconds after which the search is
+#                               stopped and the regions found so far are
+#                               written (0 indicates no limit)
+#           sliverWidth     --  intervals no wider than this that are left
+#                               next to a newly found region are covered by a
+#                               neighboring basis where possible, rather than
+#                               being solved (0 disables this)
+#           floatEngine     --  a boolean indicating whether or not the search
+#                               should be carried out in floating point (see
+#                               float_engine.py), giving a fast, approximate
+#                               solution
 #
 # Outputs:  numThreads
 #           parallelStart
+#           showProgress
+#           checkpointFile
+#           checkpointInterval
+#           resumeFile
+#           precision
+#           refinePrecision
+#           warmStartFile
+#           queryFile
+#           subInterval
+#           coordinatorAddress
+#           workerAddress
+#           authKey
+#           workerTimeout
+#           coordinatorTimeout
+#           stackSize
+#           stackSizeMax
+#           maxRSS
+#           startMethod
+#           parallelPivot
+#           splitStrategy
+#           largestFirst
+#           lpEngine
+#           presolve
+#           verify
+#           pivotRule
+#           hybridIterations
+#           rhsFile
+#           timeLimit
+#           sliverWidth
+#           floatEngine
 def ReadFlags(  sys, 
                 logging, 
                 numThreads,
                 parallelStart,
-                showProgress):
+                showProgress,
+                checkpointFile,
+                checkpointInterval,
+                resumeFile,
+                precision,
+                refinePrecision,
+                warmStartFile,
+                queryFile,
+                subInterval,
+                coordinatorAddress,
+                workerAddress,
+                authKey,
+                workerTimeout,
+                coordinatorTimeout,
+                stackSize,
+                stackSizeMax,
+                maxRSS,
+                startMethod,
+                parallelPivot,
+                splitStrategy,
+                largestFirst,
+                lpEngine,
+                presolve,
+                verify,
+                pivotRule,
+                hybridIterations,
+                rhsFile,
+                timeLimit,
+                sliverWidth,
+                floatEngine):
     # Read the flags
     
     i = 2
@@ -59,7 +205,7 @@ def ReadFlags(  sys,
                 elif sys.argv[i].upper() == "F":
                     parallelStart = False
                 else:
-                    PrintInvalidParameterMessage("-parStart", parallelPivot, "T and F", logging);
+                    PrintInvalidParameterMessage("-parStart", parallelStart, "T and F", logging);
             elif sys.argv[i] == "-showProgress":
                 i += 1
                 if sys.argv[i].upper() == "T":
@@ -78,9 +224,225 @@ def ReadFlags(  sys,
                         PrintInvalidParameterMessage("-numThreads", numThreads, "positive integers", logging);
                 except ValueError:
                     PrintInvalidParameterMessage("-numThreads", numThreads, "positive integers", logging);
+            elif sys.argv[i] == "-checkpoint":
+                i += 1
+                checkpointFile = sys.argv[i]
+            elif sys.argv[i] == "-checkpointInterval":
+                i += 1
+                try:
+                    val = float(sys.argv[i])
+                    if val > 0:
+                        checkpointInterval = val
+                    else:
+                        PrintInvalidParameterMessage("-checkpointInterval", checkpointInterval, "positive numbers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-checkpointInterval", checkpointInterval, "positive numbers", logging);
+            elif sys.argv[i] == "-resume":
+                i += 1
+                resumeFile = sys.argv[i]
+            elif sys.argv[i] == "-warmStart":
+                i += 1
+                warmStartFile = sys.argv[i]
+            elif sys.argv[i] == "-queries":
+                i += 1
+                queryFile = sys.argv[i]
+            elif sys.argv[i] == "-interval":
+                i += 1
+                try:
+                    vals = [float(val) for val in sys.argv[i].split(",")]
+                    if len(vals) == 2 and vals[0] <= vals[1]:
+                        subInterval = vals
+                    else:
+                        PrintInvalidParameterMessage("-interval", subInterval, "pairs of comma delimited numbers 'lower,upper' with lower <= upper", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-interval", subInterval, "pairs of comma delimited numbers 'lower,upper' with lower <= upper", logging);
+            elif sys.argv[i] == "-coordinator":
+                i += 1
+                host, sep, port = sys.argv[i].rpartition(":")
+                if port.isdigit() and int(port) > 0 and (sep == "" or host != ""):
+                    coordinatorAddress = sys.argv[i]
+                else:
+                    PrintInvalidParameterMessage("-coordinator", coordinatorAddress, "positive port numbers, optionally preceded by a host as 'host:port'", logging);
+            elif sys.argv[i] == "-worker":
+                i += 1
+                workerAddress = sys.argv[i]
+            elif sys.argv[i] == "-authKey":
+                i += 1
+                authKey = sys.argv[i]
+            elif sys.argv[i] == "-workerTimeout":
+                i += 1
+                try:
+                    val = float(sys.argv[i])
+                    if val > 0:
+                        workerTimeout = val
+                    else:
+                        PrintInvalidParameterMessage("-workerTimeout", workerTimeout, "positive numbers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-workerTimeout", workerTimeout, "positive numbers", logging);
+            elif sys.argv[i] == "-coordinatorTimeout":
+                i += 1
+                try:
+                    val = float(sys.argv[i])
+                    if val >= 0:
+                        coordinatorTimeout = val
+                    else:
+                        PrintInvalidParameterMessage("-coordinatorTimeout", coordinatorTimeout, "nonnegative numbers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-coordinatorTimeout", coordinatorTimeout, "nonnegative numbers", logging);
+            elif sys.argv[i] == "-stackSize":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val > 0:
+                        stackSize = val
+                    else:
+                        PrintInvalidParameterMessage("-stackSize", stackSize, "positive integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-stackSize", stackSize, "positive integers", logging);
+            elif sys.argv[i] == "-stackSizeMax":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val > 0:
+                        stackSizeMax = val
+                    else:
+                        PrintInvalidParameterMessage("-stackSizeMax", stackSizeMax, "positive integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-stackSizeMax", stackSizeMax, "positive integers", logging);
+            elif sys.argv[i] == "-maxRSS":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val >= 0:
+                        maxRSS = val
+                    else:
+                        PrintInvalidParameterMessage("-maxRSS", maxRSS, "nonnegative integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-maxRSS", maxRSS, "nonnegative integers", logging);
+            elif sys.argv[i] == "-startMethod":
+                i += 1
+                if sys.argv[i] in ["fork", "spawn", "forkserver"]:
+                    startMethod = sys.argv[i]
+                else:
+                    PrintInvalidParameterMessage("-startMethod", startMethod, "fork, spawn or forkserver", logging);
+            elif sys.argv[i] == "-parallelPivot":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val >= 0:
+                        parallelPivot = val
+                    else:
+                        PrintInvalidParameterMessage("-parallelPivot", parallelPivot, "nonnegative integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-parallelPivot", parallelPivot, "nonnegative integers", logging);
+            elif sys.argv[i] == "-splitStrategy":
+                i += 1
+                if sys.argv[i] in ["midpoint", "adjacent", "predict"]:
+                    splitStrategy = sys.argv[i]
+                else:
+                    PrintInvalidParameterMessage("-splitStrategy", splitStrategy, "midpoint, adjacent and predict", logging);
+            elif sys.argv[i] == "-largestFirst":
+                i += 1
+                if sys.argv[i].upper() == "T":
+                    largestFirst = True
+                elif sys.argv[i].upper() == "F":
+                    largestFirst = False
+                else:
+                    PrintInvalidParameterMessage("-largestFirst", largestFirst, "T and F", logging);
+            elif sys.argv[i] == "-lpEngine":
+                i += 1
+                if sys.argv[i].upper() == "T":
+                    lpEngine = True
+                elif sys.argv[i].upper() == "F":
+                    lpEngine = False
+                else:
+                    PrintInvalidParameterMessage("-lpEngine", lpEngine, "T and F", logging);
+            elif sys.argv[i] == "-presolve":
+                i += 1
+                if sys.argv[i].upper() == "T":
+                    presolve = True
+                elif sys.argv[i].upper() == "F":
+                    presolve = False
+                else:
+                    PrintInvalidParameterMessage("-presolve", presolve, "T and F", logging);
+            elif sys.argv[i] == "-verify":
+                i += 1
+                if sys.argv[i].upper() == "T":
+                    verify = True
+                elif sys.argv[i].upper() == "F":
+                    verify = False
+                else:
+                    PrintInvalidParameterMessage("-verify", verify, "T and F", logging);
+            elif sys.argv[i] == "-pivotRule":
+                i += 1
+                if sys.argv[i] in ["leastIndex", "mostNegative", "randomized", "hybrid"]:
+                    pivotRule = sys.argv[i]
+                else:
+                    PrintInvalidParameterMessage("-pivotRule", pivotRule, "leastIndex, mostNegative, randomized and hybrid", logging);
+            elif sys.argv[i] == "-hybridIterations":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val >= 0:
+                        hybridIterations = val
+                    else:
+                        PrintInvalidParameterMessage("-hybridIterations", hybridIterations, "nonnegative integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-hybridIterations", hybridIterations, "nonnegative integers", logging);
+            elif sys.argv[i] == "-precision":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val > 0:
+                        precision = val
+                    else:
+                        PrintInvalidParameterMessage("-precision", precision, "positive integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-precision", precision, "positive integers", logging);
+            elif sys.argv[i] == "-refinePrecision":
+                i += 1
+                try:
+                    val = int(sys.argv[i])
+                    if val > 0:
+                        refinePrecision = val
+                    else:
+                        PrintInvalidParameterMessage("-refinePrecision", refinePrecision, "positive integers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-refinePrecision", refinePrecision, "positive integers", logging);
+            elif sys.argv[i] == "-rhsFile":
+                i += 1
+                rhsFile = sys.argv[i]
+            elif sys.argv[i] == "-timeLimit":
+                i += 1
+                try:
+                    val = float(sys.argv[i])
+                    if val >= 0:
+                        timeLimit = val
+                    else:
+                        PrintInvalidParameterMessage("-timeLimit", timeLimit, "nonnegative numbers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-timeLimit", timeLimit, "nonnegative numbers", logging);
+            elif sys.argv[i] == "-sliverWidth":
+                i += 1
+                try:
+                    val = float(sys.argv[i])
+                    if val >= 0:
+                        sliverWidth = val
+                    else:
+                        PrintInvalidParameterMessage("-sliverWidth", sliverWidth, "nonnegative numbers", logging);
+                except ValueError:
+                    PrintInvalidParameterMessage("-sliverWidth", sliverWidth, "nonnegative numbers", logging);
+            elif sys.argv[i] == "-floatEngine":
+                i += 1
+                if sys.argv[i].upper() == "T":
+                    floatEngine = True
+                elif sys.argv[i].upper() == "F":
+                    floatEngine = False
+                else:
+                    PrintInvalidParameterMessage("-floatEngine", floatEngine, "T and F", logging);
             else:
                 print("Invalid Command Line Argument. Exiting.\n")
                 sys.exit("Got " + str(sys.argv[i]))
         i += 1
     
-    return numThreads, parallelStart, showProgress
+    return numThreads, parallelStart, showProgress, checkpointFile, checkpointInterval, resumeFile, precision, refinePrecision, warmStartFile, queryFile, subInterval, coordinatorAddress, workerAddress, authKey, workerTimeout, coordinatorTimeout, stackSize, stackSizeMax, maxRSS, startMethod, parallelPivot, splitStrategy, largestFirst, lpEngine, presolve, verify, pivotRule, hybridIterations, rhsFile, timeLimit, sliverWidth, floatEngine
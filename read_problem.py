@@ -39,6 +39,28 @@ def printLatexTableau(basis, matrix):
     print("\\cline{2-" + str(len(matrix[0]) + 1) + "}")
     print("\\end{array}$")
 
+# Get the name used in the solution file for the basic variable of a given row
+#
+# Inputs:   i       --  the row index
+#           basis   --  a list indicating the basic variable of each row
+#           numVar  --  the number of variables present in the current instance
+#           numRow  --  the number of constraints (only used for upLP and upQP)
+#           probType    --  the type of problem ("LCP", "LP" or "QP")
+#
+# Output:   the name of the variable
+def VariableName(i, basis, numVar, numRow, probType):
+    if probType == "LCP":
+        if basis[i] < numVar:
+            return "w_" + str(i + 1)
+        return "z_" + str(i + 1)
+    if basis[i] < numVar:
+        if i >= numRow:
+            return "v_" + str(i + 1 - numRow)
+        return "s_" + str(i + 1)
+    if i >= numRow: 
+        return "y_" + str(i + 1 - numRow)
+    return "u_" + str(i + 1)
+
 # Initialize the G matrix and vector of parameters (treated as variables)
 #
 # Inputs:   pari    --  the Pari environment
@@ -427,3 +449,54 @@ def ReadQP(lines, start, Pari, sys, logging, re, numVar, numParam, gMatrix, xVar
         i += 1
             
     return numVar, numParam, gMatrix, xVar, paramSpace, mIsNumeric, numRow, numCol
+
+# Parse a file of additional right hand sides q(x) for the LCP read from the
+# data file (see ReadFile). The file holds one or more blocks, each consisting
+# of the keyword 'q_data' followed by lines in the format of the q_data section
+# of an LCP data file, and optionally ends with 'END'. The row indices refer to
+# the rows of the LCP (so for instances given as an LP or QP, the rows of b(x)
+# come first and those of c(x) after them).
+#
+# Input:    Pari    --  the Pari environment
+#           sys     --  the variable containing any information passed at the
+#                       command line
+#           re      --  the re environment (for parsing real expressions)
+#           rhsFile --  the name of the file
+#           numVar  --  the number of variables (rows) of the LCP
+#           xVar    --  the vector containing the Pari variables that represent
+#                       the problem's parameters
+#
+# Output:   a list holding each right hand side as a list of numVar Pari
+#           elements
+def ReadRHSFile(Pari, sys, re, rhsFile, numVar, xVar):
+    with open(rhsFile) as rhsIn:
+        lines = rhsIn.read().split('\n') + [""]
+    rhs = []
+    i = 0
+    while i < len(lines):
+        if lines[i].strip().upper() == "Q_DATA":
+            column = [Pari.zero() for _ in range(numVar)]
+            i += 1
+            while not lines[i].strip() == "" and lines[i].strip()[0].isdigit():
+                vals = re.findall('[-+]?\d*\.?\d+', lines[i])
+                if len(vals) < 3:
+                    sys.exit("Data for the 'q' vector must contain three comma delimited values: (1) the row index, (2) the parameter index -- with 0 indicating a constant -- and (3) the coeficient. Please reformat your data and retry. Exiting!")
+                if int(vals[0]) < 1 or int(vals[0]) > numVar or int(vals[1]) > len(xVar) - 2:
+                    sys.exit("The entry " + repr(lines[i].strip()) + " of " + rhsFile + " lies outside of the 'q' vector. Exiting!")
+                if '.' in vals[2]:
+                    vals[2] = ConvertToFraction(vals[2])
+                if vals[1] == '0':
+                    column[int(vals[0]) - 1] += Pari(vals[2])
+                else:
+                    column[int(vals[0]) - 1] += Pari(vals[2])*xVar[int(vals[1]) - 1]
+                i += 1
+            rhs.append(column)
+        elif lines[i].strip().upper() == "END":
+            break
+        elif not lines[i].strip() == "":
+            sys.exit("Unrecognized symbol " + repr(lines[i]) + " in " + rhsFile + ", please adjust and retry. Exiting!")
+        else:
+            i += 1
+    if len(rhs) == 0:
+        sys.exit("No 'q_data' block was found in " + rhsFile + ". Exiting!")
+    return rhs
@@ -0,0 +1,324 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Run upLCPsolver as a long-lived daemon that accepts solve
+#                   requests over a Unix socket or a localhost TCP port. The
+#                   daemon imports the solver (and initializes PARI) once, and
+#                   each job is forked from it, so jobs do not pay the start up
+#                   costs of the interpreter, of cypari2 or of the solver's
+#                   modules. Jobs run concurrently, with the daemon's threads
+#                   shared evenly between them.
+#
+#                   The daemon is started as
+#
+#                   python3 solver_daemon.py -socket /path/to/socket
+#                       (-numThreads N) (-maxJobs M) (-jobDir dir)
+#                       (-authKey key | -keyFile file)
+#
+#                   (or with -port P in place of -socket), and a job is
+#                   submitted as
+#
+#                   python3 solver_daemon.py (-authKey key | -keyFile file)
+#                       -submit /path/to/socket /path/to/data/file (options)
+#
+#                   where the options are those accepted by upLCP_solver.py.
+#                   Unless a key is given, the daemon generates one and writes
+#                   it to a file that only its owner can read, from which
+#                   clients read it.
+#
+################################################################################
+
+from multiprocessing.connection import Listener, Client, deliver_challenge, answer_challenge, AuthenticationError
+from multiprocessing.sharedctypes import RawValue
+from cypari2 import Pari
+import worker_pool
+import multiprocessing
+import threading
+import traceback
+import signal
+import secrets
+import runpy
+import queue
+import time
+import sys
+import os
+
+
+# Path of the solver script run by each job
+SOLVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "upLCP_solver.py")
+
+# Number of seconds a client may take to send its request once connected
+RECEIVE_TIMEOUT = 60.0
+
+
+# Define Functions
+
+# Interpret the address of a daemon: a port number on localhost, or the path of
+# a Unix socket
+#
+# Input:    address --  the address, as given at the command line
+#
+# Output:   the address in the form expected by Listener and Client
+def DaemonAddress(address):
+    if str(address).isdigit():
+        return ("127.0.0.1", int(address))
+    return str(address)
+
+# Get the default path of the file holding a daemon's key: next to the socket,
+# or in the job directory if the daemon listens on a port
+#
+# Input:    address --  the address of the daemon, as given at the command line
+#           jobDir  --  the directory in which the daemon creates job directories
+#
+# Output:   the path of the key file
+def DefaultKeyFile(address, jobDir):
+    if str(address).isdigit():
+        return os.path.join(jobDir, "daemon_" + str(address) + ".key")
+    return str(address) + ".key"
+
+# Write a key to a file that only the current user can read
+#
+# Input:    keyFile --  the path of the file
+#           authKey --  the key
+def WriteKeyFile(keyFile, authKey):
+    os.makedirs(os.path.dirname(os.path.abspath(keyFile)), exist_ok = True)
+    if os.path.exists(keyFile):
+        os.remove(keyFile)
+    fd = os.open(keyFile, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as keyOut:
+        keyOut.write(authKey)
+
+# Submit a job to a daemon and wait for it to finish
+#
+# Input:    address --  the address of the daemon (see DaemonAddress)
+#           authKey --  the key used to authenticate with the daemon
+#           request --  a dictionary describing the job. It must contain either
+#                       "instance", the path of a data file, or "data", the
+#                       contents of a data file. It may also contain "options",
+#                       a list of command line options for upLCP_solver.py, and
+#                       "inline", a boolean indicating whether or not the
+#                       contents of the solution file should be returned.
+#
+# Output:   reply   --  a dictionary containing the job number ("job"), the
+#                       solver's exit code ("exitCode"), its error message, if
+#                       any ("message"), the paths of the job's solution and log
+#                       files ("solution" and "log"), the elapsed time ("time")
+#                       and, if requested, the contents of the solution file
+#                       ("result")
+def SubmitJob(address, authKey, request):
+    conn = Client(DaemonAddress(address), authkey = authKey.encode())
+    try:
+        conn.send(request)
+        return conn.recv()
+    finally:
+        conn.close()
+
+# Run a job in the current (forked) process and send its outcome to the client.
+# The job runs in its own directory, to which the solver writes its output, and
+# its output to the terminal is written to log.txt.
+#
+# Input:    conn    --  the connection to the client
+#           jobId   --  the number of the job
+#           request --  the dictionary describing the job (see SubmitJob)
+#           jobDir  --  the directory in which to run the job
+def RunJob(conn, jobId, request, jobDir):
+    # The process must never return to the daemon's loop, whatever happens
+    exitCode = 1
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        start = time.time()
+        exitCode = 0
+        message = ""
+        try:
+            os.makedirs(jobDir, exist_ok = True)
+            os.chdir(jobDir)
+            instance = request.get("instance", "")
+            if "data" in request:
+                instance = os.path.join(jobDir, "instance.dat")
+                with open(instance, 'w') as dataFile:
+                    dataFile.write(request["data"])
+            logFile = open(os.path.join(jobDir, "log.txt"), 'w')
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(logFile.fileno(), 1)
+            os.dup2(logFile.fileno(), 2)
+
+            sys.argv = [SOLVER, instance] + [str(option) for option in request.get("options", [])]
+            runpy.run_path(SOLVER, run_name = '__main__')
+        except SystemExit as err:
+            if isinstance(err.code, int):
+                exitCode = err.code
+            elif err.code is not None:
+                exitCode = 1
+                message = str(err.code)
+                print(message, file = sys.stderr)
+        except BaseException:
+            exitCode = 1
+            message = traceback.format_exc()
+            print(message, file = sys.stderr)
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        solution = os.path.join(jobDir, "Solution.txt")
+        reply = {   "job": jobId,
+                    "exitCode": exitCode,
+                    "message": message,
+                    "solution": solution if os.path.exists(solution) else "",
+                    "log": os.path.join(jobDir, "log.txt"),
+                    "time": time.time() - start}
+        if request.get("inline", False) and os.path.exists(solution):
+            with open(solution) as solutionFile:
+                reply["result"] = solutionFile.read()
+        try:
+            conn.send(reply)
+        except (OSError, ValueError):
+            pass
+    finally:
+        os._exit(exitCode)
+
+# Serve jobs until interrupted. Connections are accepted by a background thread
+# and each is authenticated, and its request received, by a thread of its own
+# (so that a slow client does not hold up others). Requests are queued, and the
+# main thread starts the queued jobs, first come first served, while fewer than
+# maxJobs are running. Each running job may use an equal share of the
+# numThreads threads, which is updated as jobs start and finish (a job's worker
+# pool adjusts to it between intervals).
+#
+# Input:    address     --  the address on which to listen (see DaemonAddress)
+#           authKey     --  the key clients must present to connect (if empty,
+#                           a key is generated and written to keyFile)
+#           keyFile     --  the file to which a generated key is written
+#           numThreads  --  the number of threads shared by the running jobs
+#           maxJobs     --  the maximum number of jobs run at once
+#           jobDir      --  the directory in which each job's directory is
+#                           created
+def ServeJobs(address, authKey, keyFile, numThreads, maxJobs, jobDir):
+    # Initialize PARI and import the solver's modules before forking any jobs
+    Pari()
+    import upLCP_solver
+
+    # Jobs are forked from the main thread only, since PARI cannot be used in
+    # other threads
+    worker_pool.threadShare = RawValue('i', numThreads)
+    if authKey == "":
+        authKey = secrets.token_hex(32)
+        WriteKeyFile(keyFile, authKey)
+        print("Wrote the key of the daemon to " + keyFile)
+    else:
+        keyFile = ""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    listener = Listener(DaemonAddress(address))
+    waiting = queue.Queue()
+    def Receive(conn):
+        try:
+            deliver_challenge(conn, authKey.encode())
+            answer_challenge(conn, authKey.encode())
+            if conn.poll(RECEIVE_TIMEOUT):
+                waiting.put((conn, conn.recv()))
+                return
+        except (OSError, EOFError, AuthenticationError):
+            pass
+        conn.close()
+    def Accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                continue
+            threading.Thread(target = Receive, args = (conn,), daemon = True).start()
+    threading.Thread(target = Accept, daemon = True).start()
+    print("Accepting jobs at " + str(address) + " using " + str(numThreads) + " threads")
+    sys.stdout.flush()
+
+    running = {}
+    numJobs = 0
+    try:
+        while True:
+            # Forget jobs that have finished
+            while len(running) > 0:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+                if pid in running:
+                    print("Job " + str(running.pop(pid)) + " finished with exit code " + str(os.waitstatus_to_exitcode(status)))
+                    sys.stdout.flush()
+
+            # Start queued jobs
+            while len(running) < maxJobs and not waiting.empty():
+                conn, request = waiting.get()
+                numJobs += 1
+                worker_pool.threadShare.value = max(1, numThreads//(len(running) + 1))
+                pid = os.fork()
+                if pid == 0:
+                    RunJob(conn, numJobs, request, os.path.join(jobDir, "job" + str(numJobs)))
+                conn.close()
+                running[pid] = numJobs
+                print("Started job " + str(numJobs) + " (process " + str(pid) + ")")
+                sys.stdout.flush()
+            worker_pool.threadShare.value = max(1, numThreads//max(1, len(running)))
+            time.sleep(0.1)
+    finally:
+        listener.close()
+        if keyFile != "" and os.path.exists(keyFile):
+            os.remove(keyFile)
+
+
+if __name__ == '__main__':
+    address = ""
+    authKey = ""
+    keyFile = ""
+    numThreads = multiprocessing.cpu_count()
+    maxJobs = 0
+    jobDir = os.path.abspath("upLCP_jobs")
+    submit = ""
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == "-socket" or sys.argv[i] == "-port":
+            i += 1
+            address = sys.argv[i]
+        elif sys.argv[i] == "-authKey":
+            i += 1
+            authKey = sys.argv[i]
+        elif sys.argv[i] == "-keyFile":
+            i += 1
+            keyFile = os.path.abspath(sys.argv[i])
+        elif sys.argv[i] == "-numThreads":
+            i += 1
+            numThreads = max(1, int(sys.argv[i]))
+        elif sys.argv[i] == "-maxJobs":
+            i += 1
+            maxJobs = max(1, int(sys.argv[i]))
+        elif sys.argv[i] == "-jobDir":
+            i += 1
+            jobDir = os.path.abspath(sys.argv[i])
+        elif sys.argv[i] == "-submit":
+            i += 1
+            submit = sys.argv[i]
+            break
+        else:
+            sys.exit("Invalid Command Line Argument " + str(sys.argv[i]) + ". Exiting!")
+        i += 1
+
+    if submit != "":
+        if i + 1 >= len(sys.argv):
+            sys.exit("No data file was given. Exiting!")
+        if authKey == "":
+            keyFile = keyFile if keyFile != "" else DefaultKeyFile(submit, jobDir)
+            if not os.path.exists(keyFile):
+                sys.exit("No key was given (via -authKey or -keyFile) and the key file " + keyFile + " does not exist. Exiting!")
+            with open(keyFile) as keyIn:
+                authKey = keyIn.read().strip()
+        reply = SubmitJob(submit, authKey, {"instance": os.path.abspath(sys.argv[i + 1]), "options": sys.argv[i + 2:]})
+        print("Job " + str(reply["job"]) + " finished in " + str(round(reply["time"], 2)) + "s with exit code " + str(reply["exitCode"]))
+        if reply["message"] != "":
+            print(reply["message"])
+        print("Solution: " + reply["solution"])
+        print("Log: " + reply["log"])
+        sys.exit(reply["exitCode"])
+
+    if address == "":
+        sys.exit("Either -socket or -port must be given. Exiting!")
+    ServeJobs(address, authKey, keyFile if keyFile != "" else DefaultKeyFile(address, jobDir), numThreads, maxJobs if maxJobs > 0 else numThreads, jobDir)
@@ -22,7 +22,17 @@ from read_problem import *
 from matrix_manipulation import *
 from crisscross import *
 from up_inv_region import *
+from checkpoint import *
+from precision import *
+from partition import *
+from warm_start import *
+from lazy_query import *
+from distributed import *
+from worker_resources import *
+from worker_pool import *
+from presolve import *
 import random
+import json
 import os
 
 # Initialize pari
@@ -46,245 +56,623 @@ numThreads      = multiprocessing.cpu_count()
 originalGmatrix = []
 originalBasis   = []
 outputFilename  = "Solution.txt"
+checkpointFile  = ""
+checkpointInterval  = 600.0
+resumeFile      = ""
+precision       = 64
+refinePrecision = 256
+warmStartFile   = ""
+queryFile       = ""
+subInterval     = []
+queryFilename   = "QueryResults.txt"
+coordinatorAddress  = ""
+workerAddress   = ""
+authKey         = ""
+workerTimeout   = 60.0
+coordinatorTimeout  = 600.0
+stackSize       = 8000000
+stackSizeMax    = 1000000000
+maxRSS          = 0
+startMethod     = ""
+parallelPivot   = 75
+splitStrategy   = "midpoint"
+largestFirst    = False
+lpEngine        = True
+presolve        = True
+verify          = False
+pivotRule       = "leastIndex"
+hybridIterations= 0
+rhsFile         = ""
+timeLimit       = 0.0
+sliverWidth     = 0.00001
+floatEngine     = False
+postsolve       = None
+regions         = []
+failedIntervals = []
+abandoned       = []
+rhsColumns      = []
+batchRegions    = []
+deadline        = 0.0
+timedOut        = False
 
-# Define function for parallel processing
-def ProcessQ(q, finalPartition, created, finished, lock, numThreads):
-    if showProgress:
-        print("Activating thread", os.getpid())
-    while True:
-        interval, curBasis, curMat = q.get(block=True) #block=True means make a blocking call to wait for items in queue
-        if interval is None:
-            break
-
-        if showProgress:
-            print("Thread", os.getpid(), "is processing interval", interval)
-        
-        mult = 0.5
-        point = [mult*interval[0] + (1.0 - mult)*interval[1], 0]
-        basis, mat, feasible = CrissCross(pari, logging, numVar, curMat, xVar, point, epsilon, curBasis)
-        
-        if not feasible:
-            sys.exit("Criss Cross failed. Exiting.")
-
-        rgn = InvRgn(pari, mat, basis, xVar, point, epsilon, paramSpace, interval)
-        lval, rval = rgn.GetExtremes(pari)
-        finalPartition.put(rgn)
-
-        if lval - interval[0] > epsilon:
-            q.put( ([interval[0], lval], copy.deepcopy(basis), copy.deepcopy(mat)) )
-            with lock:
-                created.value += 1
-        if rval - interval[1] < -epsilon:
-            q.put( ([rval, interval[1]], copy.deepcopy(basis), copy.deepcopy(mat)) )
-            with lock:
-                created.value += 1
-        with lock:
-            finished.value += 1
-        if created.value == finished.value:
-            for i in range(numThreads):
-                q.put((None,None,None))
-
-# Set parameters using command line flags
-if len(sys.argv) > 2:
-    numThreads,     \
-    parallelStart,  \
-    showProgress  = ReadFlags(  sys, 
-                                logging, 
-                                numThreads,
-                                parallelStart,
-                                showProgress)
-
-if numThreads <= 1:
-    parallelStart = False
-elif numThreads > multiprocessing.cpu_count():
-    numThreads = multiprocessing.cpu_count()
-
-# Read in the problem instance
-t = time.time()
-numVar, numParam, gMatrix, xVar, paramSpace, mIsNumeric, probType, numRow, numCol = ReadFile(   pari, 
-                                                                                                sys, 
-                                                                                                logging, 
-                                                                                                re, 
-                                                                                                numVar, 
-                                                                                                numParam, 
-                                                                                                gMatrix, 
-                                                                                                xVar, 
-                                                                                                paramSpace, 
-                                                                                                gxInitialized, 
-                                                                                                mIsNumeric)
-
-originalGmatrix = [row[:] for row in gMatrix] #deep copy
-originalBasis = list(range(numVar))
-
-totalTime = time.time() - t
-if showProgress:
-    print("Time to read problem: " + str(round(totalTime, 2)) + "s")
-
-if mIsNumeric:
-    logging.warning("Warning: The data entered consists of an M matrix containing no parameters. While the method implemented here is applicable for this problem, a more efficient procedure exists. See Adelgren and Wiecek's 'A two phase algorithm for the multiparametric linear complementarity problem' (2016). This method may implemented here in a future release, but is not as of now. Continuing ... ")
-
-# Initialize
-startingPoint = [float((paramSpace[1][1] - paramSpace[0][1])/2.0), 0]
-ones = [1 for i in xVar]
-endPoints = []
-for i in range(len(paramSpace[0])):
-    if pari.substvec(paramSpace[i][0], xVar, ones) > 0:
-        endPoints.append(paramSpace[i][1])
-    else:
-        endPoints.append(-paramSpace[i][1])
-leftVal = startingPoint[0]
-rightVal = startingPoint[0]
-endPoints.sort()
-
-# Set and initialize tools for parallelization
-m = multiprocessing.Manager()
-q = m.Queue()
-finalPartition = m.Queue()
-created = m.Value('i', 0)
-finished = m.Value('i', 0)
-lock = m.Lock()
-if parallelStart:
-    leftEnd = endPoints[0]
-    n = numThreads - 1
-    for i in range(n):
-        rightEnd = (i+1)*endPoints[1]/(n*1.0)
-        newInterval = [leftEnd, rightEnd]
-        q.put( (copy.deepcopy(newInterval), copy.deepcopy(originalBasis), copy.deepcopy(gMatrix)) )
-        with lock:
-            created.value += 1
-        leftEnd = rightEnd
-else:
-    q.put( (endPoints, copy.deepcopy(originalBasis), copy.deepcopy(gMatrix)) )
-    with lock:
-        created.value += 1
-        
-if __name__ == '__main__':
-    pool = multiprocessing.Pool(numThreads, ProcessQ, (q, finalPartition, created, finished, lock, numThreads, ))
-
-    # prevent adding anything more to the queue and wait for queue to empty
-    pool.close()
-    pool.join()
-    pool.terminate()
-
-
-totalTime = time.time() - t
-
-print("Solution Computed. Elapsed Time: " + str(round(totalTime, 2)) + "s")
+# Move all regions currently stored in the shared partition queue to the list of
+# regions held by the main process
+def CollectRegions(finalPartition, regions):
+    while not finalPartition.empty():
+        regions.append(finalPartition.get())
 
+# Write a checkpoint. Pending tasks are read before regions are collected so
+# that a task finishing in between is, at worst, listed both as a region and as
+# pending, rather than not at all. Tasks abandoned by a coordinator are also
+# listed as pending.
+def SaveCheckpoint(finalPartition, pending, regions):
+    pendingTasks = list(pending.values()) + abandoned
+    CollectRegions(finalPartition, regions)
+    WriteCheckpoint(checkpointFile, 
+                    numVar, 
+                    [(rgn.EndPoints(), rgn.Basis()) for rgn in regions], 
+                    pendingTasks)
 
-# Write the solution
+# Rebuild invariancy regions from their endpoints and bases. Each tableau is
+# recovered by pivoting from the previously recovered one, since neighboring
+# regions usually differ in only a few basic variables.
+def RebuildRegions(oldRegions):
+    rebuilt = []
+    lastBasis = originalBasis
+    lastMat = originalGmatrix
+    for endPnts, basis in sorted(oldRegions):
+        mat = PivotToBasis([row[:] for row in lastMat], lastBasis, basis, numVar)
+        if mat is None:
+            sys.exit("A stored basis is singular for the current instance. Exiting!")
+        lastBasis = basis
+        lastMat = [row[:] for row in mat]
+        rebuilt.append(InvRgn(pari, mat, basis, xVar, [ToReal(pari, (endPnts[0] + endPnts[1])/2, precision), 0], epsilon, paramSpace, endPnts))
+    return rebuilt
 
-outputFile = open(outputFilename, 'w')
+# Write a solution file describing the instance and the regions found for it
+#
+# Input:    outputFilename  --  the name of the solution file
+#           regions         --  the (merged) invariancy regions
+#           originalGmatrix --  the original tableau of the instance
+#           failedIntervals --  the intervals that could not be processed
+#           gaps            --  the intervals left uncovered when the time limit
+#                               expired (or None if it did not)
+#
+# Output:   the number of regions written
+def WriteSolution(outputFilename, regions, originalGmatrix, failedIntervals, gaps = None):
+    outputFile = open(outputFilename, 'w')
 
-k = 1
-if probType == "LCP":
-    print("The problem entered was an instance of upLCP having the form\n", file = outputFile)
-    print("\tw - M(x)z = q(x)\n\tw'z = 0\n\tw,z >= 0\n", file = outputFile)
+    k = 1
+    if probType == "LCP":
+        print("The problem entered was an instance of upLCP having the form\n", file = outputFile)
+        print("\tw - M(x)z = q(x)\n\tw'z = 0\n\tw,z >= 0\n", file = outputFile)
 
-    mx = max((len(str(ele.Str())) for row in originalGmatrix for ele in row[numVar:-1]))
-    print("with M(x) =\n", file = outputFile)
-    for row in originalGmatrix:
-        print("\t[ " + "  ".join(["{:<{mx}}".format(str((-1*ele).Str()),mx=mx) for ele in row[numVar:-1]]) + " ]", file = outputFile)
+        mx = max((len(str(ele.Str())) for row in originalGmatrix for ele in row[numVar:-1]))
+        print("with M(x) =\n", file = outputFile)
+        for row in originalGmatrix:
+            print("\t[ " + "  ".join(["{:<{mx}}".format(str((-1*ele).Str()),mx=mx) for ele in row[numVar:-1]]) + " ]", file = outputFile)
         
-    mx = max((len(str(ele.Str())) for row in originalGmatrix for ele in row[2*numVar:]))
-    print("\nand q(x) =\n", file = outputFile)
-    for row in originalGmatrix:
-        print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
+        mx = max((len(str(ele.Str())) for row in originalGmatrix for ele in row[2*numVar:]))
+        print("\nand q(x) =\n", file = outputFile)
+        for row in originalGmatrix:
+            print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
         
-    mx = max((len(str(ele.Str())) for row in paramSpace for ele in row))
-    print("\nsubject to the additional restriction that 'x' must satisfy:\n", file = outputFile)
-    for row in paramSpace:
-        print("\t" + " <= ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row]), file = outputFile)
+        mx = max((len(str(ele.Str())) for row in paramSpace for ele in row))
+        print("\nsubject to the additional restriction that 'x' must satisfy:\n", file = outputFile)
+        for row in paramSpace:
+            print("\t" + " <= ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row]), file = outputFile)
         
-    print("\n\n\n**************************************************************************************************\n\nThe solution was computed in " + str(round(totalTime, 2)) + " seconds and consists of the following regions.\n\n**************************************************************************************************\n\n", file = outputFile)
+        print("\n\n\n**************************************************************************************************\n\nThe solution was computed in " + str(round(totalTime, 2)) + " seconds and consists of the following regions.\n\n**************************************************************************************************\n\n", file = outputFile)
         
-    k = 1
-    while not finalPartition.empty():
-        rgn = finalPartition.get()
-        point = rgn.EndPoints()
-#        print(point)
-        if point[0] != point[1]:
-            print("\n\nRegion " + str(k) + ":\n", file = outputFile)
-            rhs = rgn.RHS()
-            basis = rgn.Basis()
-            mx = max((len(str(row.Str())) for row in rhs))
-            for i in range(len(rhs)):
-                var = ""
-                if basis[i] < numVar:
-                    var = "w_" + str(i + 1)
-                else:
-                    var = "z_" + str(i + 1)
-                print("\t" + var + " = " + " ".join(["{:<{mx}}".format(str(rhs[i].Str()),mx=mx)]) + " >= 0 ", file = outputFile)
-            print("\n\tValid over:\t" + str('%.15g'%point[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%point[1]), file = outputFile)
-            k = k + 1
+        k = 1
+        for rgn in regions:
+            point = rgn.EndPoints()
+    #        print(point)
+            if point[0] != point[1]:
+                print("\n\nRegion " + str(k) + ":\n", file = outputFile)
+                rhs = rgn.RHS()
+                basis = rgn.Basis()
+                mx = max((len(str(row.Str())) for row in rhs))
+                for i in range(len(rhs)):
+                    var = VariableName(i, basis, numVar, numRow, probType)
+                    print("\t" + var + " = " + " ".join(["{:<{mx}}".format(str(rhs[i].Str()),mx=mx)]) + " >= 0 ", file = outputFile)
+                print("\n\tValid over:\t" + str('%.15g'%point[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%point[1]), file = outputFile)
+                if rgn.FloatError() is not None:
+                    print("\tWarning: This region was computed from an ill-conditioned tableau (estimated relative error " + str('%.3g'%rgn.FloatError()) + ") and may be unreliable.", file = outputFile)
+                k = k + 1
             
-    print("\n\n\n\nNote: The region descriptions above do not include the 'additional restrictions' listed at the top of this document, although these restrictions do, of course, apply to all regions. Additionally, all omitted variables should be assumed to be zero.", file = outputFile)
-else:
-    print("The problem entered was an instance of up" + probType + " having the form\n", file = outputFile)
-    if probType == "LP":
-        print("\tmin \tc(x)'y\n\ts.t.\tA(x)y <= b(x)\n\t    \ty >= 0\n", file = outputFile)
+        print("\n\n\n\nNote: The region descriptions above do not include the 'additional restrictions' listed at the top of this document, although these restrictions do, of course, apply to all regions. Additionally, all omitted variables should be assumed to be zero.", file = outputFile)
     else:
-        print("\tmin \tc(x)'y + (1/2)y'Q(x)y\n\ts.t.\tA(x)y <= b(x)\n\t    \ty >= 0\n", file = outputFile)
+        print("The problem entered was an instance of up" + probType + " having the form\n", file = outputFile)
+        if probType == "LP":
+            print("\tmin \tc(x)'y\n\ts.t.\tA(x)y <= b(x)\n\t    \ty >= 0\n", file = outputFile)
+        else:
+            print("\tmin \tc(x)'y + (1/2)y'Q(x)y\n\ts.t.\tA(x)y <= b(x)\n\t    \ty >= 0\n", file = outputFile)
         
-    mx = max((len(str(ele.Str())) for row in originalGmatrix[numRow:] for ele in row[2*numVar:])) + 1
-    print("with c(x) =\n", file = outputFile)
-    for row in originalGmatrix[numRow:]:
-        print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
-        
-    if probType == "QP":
-        mx = max((len(str(ele.Str())) for row in originalGmatrix[numRow:] for ele in row[(numVar+numRow):-1])) + 1
-        print("\nand Q(x) =\n", file = outputFile)
+        mx = max((len(str(ele.Str())) for row in originalGmatrix[numRow:] for ele in row[2*numVar:])) + 1
+        print("with c(x) =\n", file = outputFile)
         for row in originalGmatrix[numRow:]:
-            print("\t[ " + "  ".join(["{:<{mx}}".format(str((-1*ele).Str()),mx=mx) for ele in row[(numVar+numRow):-1]]) + " ]", file = outputFile)
+            print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
+        
+        if probType == "QP":
+            mx = max((len(str(ele.Str())) for row in originalGmatrix[numRow:] for ele in row[(numVar+numRow):-1])) + 1
+            print("\nand Q(x) =\n", file = outputFile)
+            for row in originalGmatrix[numRow:]:
+                print("\t[ " + "  ".join(["{:<{mx}}".format(str((-1*ele).Str()),mx=mx) for ele in row[(numVar+numRow):-1]]) + " ]", file = outputFile)
             
-    mx = max((len(str(ele.Str())) for row in originalGmatrix[0:numRow] for ele in row[(numVar+numRow):-1])) + 1
-    print("\nand A(x) =\n", file = outputFile)
-    for row in originalGmatrix[0:numRow]:
-        print("\t[ " + "  ".join(["{:<{mx}}".format(str((ele).Str()),mx=mx) for ele in row[(numVar+numRow):-1]]) + " ]", file = outputFile)
+        mx = max((len(str(ele.Str())) for row in originalGmatrix[0:numRow] for ele in row[(numVar+numRow):-1])) + 1
+        print("\nand A(x) =\n", file = outputFile)
+        for row in originalGmatrix[0:numRow]:
+            print("\t[ " + "  ".join(["{:<{mx}}".format(str((ele).Str()),mx=mx) for ele in row[(numVar+numRow):-1]]) + " ]", file = outputFile)
         
-    mx = max((len(str(ele.Str())) for row in originalGmatrix[0:numRow] for ele in row[2*numVar:])) + 1
-    print("\nand b(x) =\n", file = outputFile)
-    for row in originalGmatrix[0:numRow]:
-        print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
+        mx = max((len(str(ele.Str())) for row in originalGmatrix[0:numRow] for ele in row[2*numVar:])) + 1
+        print("\nand b(x) =\n", file = outputFile)
+        for row in originalGmatrix[0:numRow]:
+            print("\t[ " + "  ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row[2*numVar:]]) + " ]", file = outputFile)
         
-    mx = max((len(str(ele.Str())) for row in paramSpace for ele in row)) + 1
-    print("\nsubject to the additional restriction that 'x' must satisfy:\n", file = outputFile)
-    for row in paramSpace:
-        print("\t" + " <= ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row]), file = outputFile)
+        mx = max((len(str(ele.Str())) for row in paramSpace for ele in row)) + 1
+        print("\nsubject to the additional restriction that 'x' must satisfy:\n", file = outputFile)
+        for row in paramSpace:
+            print("\t" + " <= ".join(["{:<{mx}}".format(str(ele.Str()),mx=mx) for ele in row]), file = outputFile)
         
-    print("\n\n\n**************************************************************************************************\n\nThe solution was computed in " + str(round(totalTime, 2)) + " seconds and consists of the following regions.\n\n**************************************************************************************************\n\n", file = outputFile)
+        print("\n\n\n**************************************************************************************************\n\nThe solution was computed in " + str(round(totalTime, 2)) + " seconds and consists of the following regions.\n\n**************************************************************************************************\n\n", file = outputFile)
         
-    k = 1
-    while not finalPartition.empty():
-        rgn = finalPartition.get()
-        point = rgn.EndPoints()
-        if point[0] != point[1]:
-            print("\n\nRegion " + str(k) + ":\n", file = outputFile)
-            rhs = rgn.RHS()
-            basis = rgn.Basis()
-            mx = max((len(str(row.Str())) for row in rhs)) + 1
-            for i in range(len(rhs)):
-                var = ""
-                if basis[i] < numVar:
-                    if i >= numRow:
-                        var = "v_" + str(i + 1 - numRow)
-                    else:
-                        var = "s_" + str(i + 1)
-                else:
-                    if i >= numRow: 
-                        var = "y_" + str(i + 1 - numRow)
-                    else:
-                        var = "u_" + str(i + 1)
-                print("\t" + var + " = " + " ".join(["{:<{mx}}".format(str(rhs[i].Str()),mx=mx)]) + " >= 0 ", file = outputFile)
-            print("\n\tValid over:\t" + str('%.15g'%point[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%point[1]), file = outputFile)
-            k = k + 1
+        k = 1
+        for rgn in regions:
+            point = rgn.EndPoints()
+            if point[0] != point[1]:
+                print("\n\nRegion " + str(k) + ":\n", file = outputFile)
+                rhs = rgn.RHS()
+                basis = rgn.Basis()
+                mx = max((len(str(row.Str())) for row in rhs)) + 1
+                for i in range(len(rhs)):
+                    var = VariableName(i, basis, numVar, numRow, probType)
+                    print("\t" + var + " = " + " ".join(["{:<{mx}}".format(str(rhs[i].Str()),mx=mx)]) + " >= 0 ", file = outputFile)
+                print("\n\tValid over:\t" + str('%.15g'%point[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%point[1]), file = outputFile)
+                if rgn.FloatError() is not None:
+                    print("\tWarning: This region was computed from an ill-conditioned tableau (estimated relative error " + str('%.3g'%rgn.FloatError()) + ") and may be unreliable.", file = outputFile)
+                k = k + 1
             
-    print("\n\n\n\nNote 1: Above, 'y' variables represent the original variables, whereas 's' variables are slack variables on the inequality constraints, 'v' variables are duals for the non-negativity restrictions on the 'y' variables, and 'u' variables are duals for the inequality constraints. Additionally, all omitted variables should be assumed to be zero.", file = outputFile)
+        print("\n\n\n\nNote 1: Above, 'y' variables represent the original variables, whereas 's' variables are slack variables on the inequality constraints, 'v' variables are duals for the non-negativity restrictions on the 'y' variables, and 'u' variables are duals for the inequality constraints. Additionally, all omitted variables should be assumed to be zero.", file = outputFile)
             
-    print("\n\nNote 2: The region descriptions above do not include the 'additional restrictions' listed at the top of this document, although these restrictions do, of course, apply to all regions.", file = outputFile)
+        print("\n\nNote 2: The region descriptions above do not include the 'additional restrictions' listed at the top of this document, although these restrictions do, of course, apply to all regions.", file = outputFile)
+        
+    if len(failedIntervals) > 0:
+        print("\n\nNote: The following intervals could not be processed (within the maximum PARI stack size, by workers that died, or before the coordinator stopped waiting for worker nodes) and are not covered by the regions above:\n", file = outputFile)
+        for interval in failedIntervals:
+            print("\t" + str('%.15g'%interval[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%interval[1]), file = outputFile)
+    if floatEngine:
+        print("\n\nNote: This solution was computed in floating point (see -floatEngine), so the expressions and endpoints above are approximate. Solve the instance without -floatEngine for an exact solution.", file = outputFile)
+    if gaps is not None:
+        print("\n\nNote: The time limit of " + str(timeLimit) + " seconds expired before the parameter space was partitioned. The following intervals are not covered by the regions above:\n", file = outputFile)
+        for interval in gaps:
+            print("\t" + str('%.15g'%interval[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%interval[1]), file = outputFile)
+    if queryFile != "":
+        print("\n\nNote: Only the regions containing the parameter values listed in " + queryFile + " were computed. Hence, the regions above need not cover the entire parameter space.", file = outputFile)
+    elif len(subInterval) > 0:
+        print("\n\nNote: Only the portion of the parameter space satisfying " + str('%.15g'%endPoints[0]) + " <= " + str(xVar[0].Str()) + " <= " + str('%.15g'%endPoints[1]) + " was partitioned.", file = outputFile)
+        
+    outputFile.close()
+
+    return k - 1
+
+# Write the intervals not covered by a solution to a JSON file, so that they can
+# be read by other programs (e.g., to be solved later using -interval)
+#
+# Input:    gapsFilename    --  the name of the file
+#           gaps            --  the intervals left uncovered when the time
+#                               limit expired
+#           failedIntervals --  the intervals that could not be processed
+def WriteGaps(gapsFilename, gaps, failedIntervals):
+    uncovered = sum(float(interval[1] - interval[0]) for interval in gaps + failedIntervals)
+    with open(gapsFilename, 'w') as gapsFile:
+        json.dump({ "timeLimit": timeLimit,
+                    "timedOut": timedOut,
+                    "interval": [float(endPoints[0]), float(endPoints[1])],
+                    "coveredFraction": 1.0 - uncovered/float(endPoints[1] - endPoints[0]),
+                    "gaps": [[float(interval[0]), float(interval[1])] for interval in gaps],
+                    "failed": [[float(interval[0]), float(interval[1])] for interval in failedIntervals]},
+                    gapsFile, indent = 4)
+
+# Worker processes are set up by InitializeWorker (see worker_pool.py) rather 
+# than by running this script. Under the spawn and forkserver start methods, 
+# they import this script without running anything below.
+if __name__ == '__main__':
+    # Set parameters using command line flags
+    if len(sys.argv) > 2:
+        numThreads,         \
+        parallelStart,      \
+        showProgress,       \
+        checkpointFile,     \
+        checkpointInterval, \
+        resumeFile,         \
+        precision,          \
+        refinePrecision,    \
+        warmStartFile,      \
+        queryFile,          \
+        subInterval,        \
+        coordinatorAddress, \
+        workerAddress,      \
+        authKey,            \
+        workerTimeout,      \
+        coordinatorTimeout, \
+        stackSize,          \
+        stackSizeMax,       \
+        maxRSS,             \
+        startMethod,        \
+        parallelPivot,      \
+        splitStrategy,      \
+        largestFirst,       \
+        lpEngine,           \
+        presolve,           \
+        verify,             \
+        pivotRule,          \
+        hybridIterations,   \
+        rhsFile,            \
+        timeLimit,          \
+        sliverWidth,        \
+        floatEngine       = ReadFlags(  sys, 
+                                        logging, 
+                                        numThreads,
+                                        parallelStart,
+                                        showProgress,
+                                        checkpointFile,
+                                        checkpointInterval,
+                                        resumeFile,
+                                        precision,
+                                        refinePrecision,
+                                        warmStartFile,
+                                        queryFile,
+                                        subInterval,
+                                        coordinatorAddress,
+                                        workerAddress,
+                                        authKey,
+                                        workerTimeout,
+                                        coordinatorTimeout,
+                                        stackSize,
+                                        stackSizeMax,
+                                        maxRSS,
+                                        startMethod,
+                                        parallelPivot,
+                                        splitStrategy,
+                                        largestFirst,
+                                        lpEngine,
+                                        presolve,
+                                        verify,
+                                        pivotRule,
+                                        hybridIterations,
+                                        rhsFile,
+                                        timeLimit,
+                                        sliverWidth,
+                                        floatEngine)
+
+    SetPrecision(pari, precision)
+    ConfigureStack(pari, stackSize, stackSizeMax)
+    context = multiprocessing.get_context(startMethod if startMethod != "" else None)
+
+    if resumeFile != "" and warmStartFile != "":
+        logging.warning("Both a checkpoint to resume from and a solution to warm start from were given. Ignoring the warm start and resuming from " + resumeFile + ".")
+        warmStartFile = ""
+    if queryFile != "" and (checkpointFile != "" or resumeFile != "" or warmStartFile != ""):
+        sys.exit("The flags -checkpoint, -resume and -warmStart cannot be used with -queries, which only computes the regions containing the queried parameter values. Exiting!")
+    if (coordinatorAddress != "" or workerAddress != "") and authKey == "":
+        sys.exit("A key must be given via -authKey to act as a coordinator or as a worker node. Exiting!")
+    if timeLimit > 0 and (queryFile != "" or workerAddress != ""):
+        sys.exit("The flag -timeLimit cannot be used with -queries or -worker (the time limit of a distributed run is set at the coordinator). Exiting!")
+
+    if numThreads <= 1:
+        parallelStart = False
+    elif numThreads > multiprocessing.cpu_count():
+        numThreads = multiprocessing.cpu_count()
+
+    # Read in the problem instance
+    t = time.time()
+    if timeLimit > 0:
+        deadline = t + timeLimit
+    numVar, numParam, gMatrix, xVar, paramSpace, mIsNumeric, probType, numRow, numCol = ReadFile(   pari, 
+                                                                                                    sys, 
+                                                                                                    logging, 
+                                                                                                    re, 
+                                                                                                    numVar, 
+                                                                                                    numParam, 
+                                                                                                    gMatrix, 
+                                                                                                    xVar, 
+                                                                                                    paramSpace, 
+                                                                                                    gxInitialized, 
+                                                                                                    mIsNumeric)
+
+    totalTime = time.time() - t
+    if showProgress:
+        print("Time to read problem: " + str(round(totalTime, 2)) + "s")
+
+    if rhsFile != "":
+        # Solve a batch of instances differing only in q(x)
+        if queryFile != "" or coordinatorAddress != "" or workerAddress != "" or resumeFile != "" or warmStartFile != "" or checkpointFile != "":
+            sys.exit("The flag -rhsFile cannot be combined with -queries, -coordinator, -worker, -resume, -warmStart or -checkpoint. Exiting!")
+        rhsColumns = ReadRHSFile(pari, sys, re, rhsFile, numVar, xVar)
+        presolve = False
+        lpEngine = False
+        if showProgress:
+            print("Read " + str(len(rhsColumns)) + " additional right hand sides from " + rhsFile)
+
+    if floatEngine:
+        # The floating point engine pivots on the tableau of the LCP
+        if queryFile != "" or rhsFile != "":
+            sys.exit("The flag -floatEngine cannot be combined with -queries or -rhsFile. Exiting!")
+        lpEngine = False
+
+    if presolve:
+        presolveTime = time.time()
+        numVar, gMatrix, paramSpace, numRow, numCol, postsolve = Presolve(pari, sys, numVar, gMatrix, xVar, paramSpace, numRow, numCol)
+        if showProgress:
+            print("Presolve removed " + str(postsolve.NumRemoved()) + " of " + str(postsolve.Original()[0]) + " variables in " + str(round(time.time() - presolveTime, 2)) + "s")
+
+    originalGmatrix = [row[:] for row in gMatrix] #deep copy
+    originalBasis = list(range(numVar))
+
+    if mIsNumeric:
+        logging.warning("Warning: The data entered consists of an M matrix containing no parameters. While the method implemented here is applicable for this problem, a more efficient procedure exists. See Adelgren and Wiecek's 'A two phase algorithm for the multiparametric linear complementarity problem' (2016). This method may implemented here in a future release, but is not as of now. Continuing ... ")
+
+    # Initialize
+    startingPoint = [float((paramSpace[1][1] - paramSpace[0][1])/2.0), 0]
+    ones = [1 for i in xVar]
+    endPoints = []
+    for i in range(len(paramSpace[0])):
+        if pari.substvec(paramSpace[i][0], xVar, ones) > 0:
+            endPoints.append(paramSpace[i][1])
+        else:
+            endPoints.append(-paramSpace[i][1])
+    leftVal = startingPoint[0]
+    rightVal = startingPoint[0]
+    endPoints.sort()
+    if len(subInterval) > 0:
+        # Only partition the requested portion of the parameter space
+        if subInterval[0] > endPoints[0]:
+            endPoints[0] = ToReal(pari, subInterval[0], precision)
+        if subInterval[1] < endPoints[1]:
+            endPoints[1] = ToReal(pari, subInterval[1], precision)
+        if endPoints[1] - endPoints[0] <= epsilon:
+            sys.exit("The interval passed via -interval does not intersect the parameter space. Exiting!")
+
+    # The instance as passed to each worker process
+    instance = SerializeInstance(   numVar, 
+                                    originalGmatrix, 
+                                    xVar, 
+                                    paramSpace, 
+                                    {   "epsilon": epsilon,
+                                        "precision": precision,
+                                        "refinePrecision": refinePrecision,
+                                        "stackSize": stackSize,
+                                        "stackSizeMax": stackSizeMax,
+                                        "maxRSS": maxRSS,
+                                        "showProgress": showProgress,
+                                        "numThreads": numThreads,
+                                        "parallelPivot": parallelPivot,
+                                        "startMethod": startMethod,
+                                        "splitStrategy": splitStrategy,
+                                        "largestFirst": largestFirst,
+                                        "probType": probType,
+                                        "numRow": numRow,
+                                        "numCol": numCol,
+                                        "lpEngine": lpEngine,
+                                        "pivotRule": pivotRule,
+                                        "hybridIterations": hybridIterations,
+                                        "rhs": [[str(val) for val in column] for column in rhsColumns],
+                                        "deadline": deadline,
+                                        "sliverWidth": sliverWidth,
+                                        "floatEngine": floatEngine,
+                                        "floatInterval": [float(endPoints[0]), float(endPoints[1])]})
+
+    if workerAddress != "":
+        # Act as a worker node, processing tasks served by a remote coordinator
+        RunWorkerNode(  ParseAddress(workerAddress), 
+                        authKey, 
+                        InstanceFingerprint(sys.argv[1]), 
+                        numThreads, 
+                        context,
+                        instance)
+        sys.exit(0)
+
+    # Set and initialize tools for parallelization
+    m = TaskManager(ctx = context)
+    m.start()
+    q = m.PriorityQueue()
+    finalPartition = m.Queue()
+    created = m.Value('i', 0)
+    finished = m.Value('i', 0)
+    lock = m.Lock()
+    stats = m.dict({"pivots": 0, "time": 0.0, "slivers": 0})
+    pending = m.dict()
+    failed = m.list()
+    active = m.dict()
+    if queryFile != "":
+        # Compute only the regions containing the queried parameter values
+        queries = ReadQueries(sys, queryFile)
+        regions = ProcessQueries(   pari,
+                                    logging,
+                                    sys,
+                                    numVar,
+                                    originalGmatrix,
+                                    xVar,
+                                    queries,
+                                    epsilon,
+                                    paramSpace,
+                                    endPoints,
+                                    precision,
+                                    refinePrecision,
+                                    showProgress)
+    elif coordinatorAddress != "":
+        # Serve tasks to remote worker nodes rather than solving locally
+        coordinator = Coordinator(InstanceFingerprint(sys.argv[1]), numVar, workerTimeout, largestFirst)
+        if resumeFile != "":
+            oldRegions, oldPending = ReadCheckpoint(pari, sys, resumeFile, numVar)
+            for endPnts, basis in oldRegions:
+                coordinator.AddRegion(endPnts, basis)
+            for interval, basis in oldPending:
+                coordinator.AddTask(interval, basis)
+        else:
+            coordinator.AddTask(endPoints, originalBasis)
+        listenAddress = ListenAddress(coordinatorAddress)
+        StartCoordinator(coordinator, listenAddress, authKey)
+        if showProgress:
+            print("Serving tasks on " + listenAddress[0] + ":" + str(listenAddress[1]))
+    elif resumeFile != "":
+        # Rebuild the regions and the queue from a checkpoint. Each tableau is
+        # recovered from its basis (by the worker processing the task) rather 
+        # than from a fresh criss cross solve.
+        oldRegions, oldPending = ReadCheckpoint(pari, sys, resumeFile, numVar)
+        regions = RebuildRegions(oldRegions)
+        for interval, basis in oldPending:
+            AddTask(q, pending, created, lock, interval, basis, None, None, largestFirst)
+        if showProgress:
+            print("Resumed from " + resumeFile + " with " + str(len(regions)) + " regions and " + str(len(oldPending)) + " pending intervals")
+    elif warmStartFile != "":
+        # Retain the regions of a previous solution whose bases are still feasible
+        # and only process the gaps between them
+        regions, gaps = WarmStart(  pari,
+                                    sys,
+                                    warmStartFile,
+                                    numVar,
+                                    numRow,
+                                    originalGmatrix,
+                                    xVar,
+                                    epsilon,
+                                    paramSpace,
+                                    endPoints,
+                                    precision,
+                                    refinePrecision,
+                                    postsolve)
+        for interval, basis, mat in gaps:
+            AddTask(q, pending, created, lock, interval, basis, mat, None, largestFirst)
+        if showProgress:
+            print("Warm started from " + warmStartFile + " with " + str(len(regions)) + " retained regions and " + str(len(gaps)) + " gaps")
+    elif parallelStart:
+        leftEnd = endPoints[0]
+        n = numThreads - 1
+        for i in range(n):
+            rightEnd = (i+1)*endPoints[1]/(n*1.0)
+            newInterval = [leftEnd, rightEnd]
+            AddTask(q, pending, created, lock, copy.deepcopy(newInterval), copy.deepcopy(originalBasis), None, None, largestFirst)
+            leftEnd = rightEnd
+    else:
+        AddTask(q, pending, created, lock, endPoints, copy.deepcopy(originalBasis), None, None, largestFirst)
         
-outputFile.close()
+    if coordinatorAddress != "":
+        # Wait for every task to be processed, unless every worker node stays
+        # out of contact for too long. The remaining tasks are then reported
+        # as not covered, and kept as pending in the checkpoint (if any).
+        lastCheckpoint = time.time()
+        while not coordinator.Finished():
+            time.sleep(0.5)
+            timedOut = deadline > 0 and time.time() >= deadline
+            if timedOut or (coordinatorTimeout > 0 and coordinator.Idle() > coordinatorTimeout):
+                abandoned = [([pari(interval[0]), pari(interval[1])], basis) for interval, basis in coordinator.Abandon()]
+                if not timedOut:
+                    logging.warning("No worker node has contacted the coordinator for " + str(coordinatorTimeout) + " seconds. Giving up on the " + str(len(abandoned)) + " remaining intervals ...")
+                    failedIntervals += [interval for interval, basis in abandoned]
+                break
+            if checkpointFile != "" and time.time() - lastCheckpoint >= checkpointInterval:
+                oldRegions, oldPending = coordinator.Snapshot()
+                WriteCheckpoint(checkpointFile, numVar, oldRegions, oldPending)
+                lastCheckpoint = time.time()
+        regions = RebuildRegions([([pari(endPnts[0]), pari(endPnts[1])], basis) for endPnts, basis in coordinator.Regions()])
+        failedIntervals += [[pari(interval[0]), pari(interval[1])] for interval in coordinator.Failed()]
+    elif queryFile == "":
+        pool = WorkerPool(context, instance, q, finalPartition, pending, failed, created, finished, lock, stats, active)
+
+        # wait for every task to be processed, keeping one worker per 
+        # outstanding task (up to numThreads). Workers that exit because of 
+        # their memory use are replaced.
+        lastCheckpoint = time.time()
+        while finished.value < created.value:
+            if deadline > 0 and time.time() >= deadline:
+                timedOut = True
+                break
+            pool.Balance(created.value - finished.value, ThreadLimit(numThreads))
+            time.sleep(0.1)
+            if checkpointFile != "" and time.time() - lastCheckpoint >= checkpointInterval:
+                SaveCheckpoint(finalPartition, pending, regions)
+                lastCheckpoint = time.time()
+
+        # stop the workers, which are now idle (or, if the time limit expired,
+        # still hold the tasks that are left pending)
+        if timedOut:
+            pool.Terminate()
+        else:
+            pool.Close()
+        failedIntervals = [interval for rhs, interval in failed if rhs == 0]
+        if showProgress:
+            print("Number of intervals processed: " + str(created.value))
+            print("Number of criss cross pivots: " + str(stats["pivots"]) + " (" + str(round(stats["time"], 2)) + "s spent in the criss cross method)")
+            print("Number of slivers covered without being solved: " + str(stats["slivers"]))
+
+    CollectRegions(finalPartition, regions)
+    if len(failedIntervals) > 0:
+        logging.warning("The following intervals could not be processed (see the warnings above) and are not covered by the solution: " + str(failedIntervals) + ".")
+    numFound = len(regions)
+    if len(rhsColumns) > 0:
+        # Set aside the regions found for the additional right hand sides
+        batchRegions = [MergeRegions([rgn for rgn in regions if rgn.RHSIndex() == j], epsilon) for j in range(1, len(rhsColumns) + 1)]
+        regions = [rgn for rgn in regions if rgn.RHSIndex() == 0]
+    regions = MergeRegions(regions, epsilon)
+    if timedOut:
+        logging.warning("The time limit of " + str(timeLimit) + " seconds expired. Writing the regions found so far; the intervals left unprocessed are listed as gaps in the solution.")
+    if showProgress:
+        print("Merged " + str(numFound) + " discovered regions into " + str(len(regions) + sum(len(rgns) for rgns in batchRegions)) + " regions")
+    if checkpointFile != "":
+        SaveCheckpoint(finalPartition, pending, regions)
+
+
+    # Restore the variables removed by presolve
+    if postsolve is not None:
+        for rgn in regions:
+            postsolve.Region(rgn)
+        numVar, originalGmatrix, paramSpace, numRow, numCol = postsolve.Original()
+
+    totalTime = time.time() - t
+
+    print("Solution Computed. Elapsed Time: " + str(round(totalTime, 2)) + "s")
+
+
+    # Write the solution. The solution for the jth additional right hand side
+    # of a batch is written to Solution_qj.txt. When a time limit is given, the
+    # intervals that are not covered are also written to <name>_gaps.json.
+    gaps = None
+    if timedOut:
+        gaps = UncoveredIntervals(regions, endPoints, epsilon, failedIntervals)
+    numRegions = WriteSolution(outputFilename, regions, originalGmatrix, failedIntervals, gaps)
+    if timeLimit > 0:
+        WriteGaps(os.path.splitext(outputFilename)[0] + "_gaps.json", gaps if gaps is not None else [], failedIntervals)
+    batchFiles = []
+    for j in range(1, len(rhsColumns) + 1):
+        batchGmatrix = [originalGmatrix[i][:2*numVar] + [rhsColumns[j - 1][i]] for i in range(numVar)]
+        batchFiles.append((os.path.splitext(outputFilename)[0] + "_q" + str(j) + ".txt", batchGmatrix))
+        batchFailed = [interval for rhs, interval in failed if rhs == j]
+        batchGaps = None
+        if timedOut:
+            batchGaps = UncoveredIntervals(batchRegions[j - 1], endPoints, epsilon, batchFailed)
+        num = WriteSolution(batchFiles[-1][0], batchRegions[j - 1], batchGmatrix, batchFailed, batchGaps)
+        if timeLimit > 0:
+            WriteGaps(os.path.splitext(batchFiles[-1][0])[0] + "_gaps.json", batchGaps if batchGaps is not None else [], batchFailed)
+        if showProgress:
+            print("Number of intervals in the partition for right hand side " + str(j) + ": " + str(num))
+
+    if queryFile != "":
+        WriteQueryResults(pari, queryFilename, queries, regions, xVar, numVar, numRow, probType)
+
+    print("Number of intervals in the final partition: " + str(numRegions))
 
-print("Number of intervals in the final partition: " + str(k - 1))
+    if verify:
+        # NumPy is only needed here
+        from verify_solution import VerifySolution
+        t = time.time()
+        problems, numPoints = VerifySolution(pari, outputFilename, numVar, numRow, originalGmatrix, xVar, paramSpace)
+        for batchFile, batchGmatrix in batchFiles:
+            batchProblems, batchPoints = VerifySolution(pari, batchFile, numVar, numRow, batchGmatrix, xVar, paramSpace)
+            problems += [batchFile + ": " + problem for problem in batchProblems]
+            numPoints += batchPoints
+        for problem in problems:
+            logging.warning(problem)
+        print("Verified the solution at " + str(numPoints) + " parameter values in " + str(round(time.time() - t, 2)) + "s: " + ("OK" if len(problems) == 0 else str(len(problems)) + " problems found"))
 
 
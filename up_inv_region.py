@@ -38,6 +38,8 @@ class InvRgn:
         self.rhs        = []
         self.point      = []
         self.endPoints  = copy.deepcopy(endPoints)
+        self.rhsIndex   = 0
+        self.floatError = None
         self.GetIneqAndGradients(pari, paramSpace, True)
 
 
@@ -67,37 +69,77 @@ class InvRgn:
         
     def EndPoints(self):
         return self.endPoints
+
+    # The index of the right hand side of a batch for which the region was
+    # found (see RHSTableau in worker_pool.py)
+    def RHSIndex(self):
+        return self.rhsIndex
+
+    # The estimated relative error of a region found in floating point from an
+    # ill-conditioned tableau (see float_engine.py), or None
+    def FloatError(self):
+        return self.floatError
     
-    # Use Polynomial Roots to Compute the Endpoints of an Interval
-    def GetExtremes(self, pari):
+    # Use Polynomial Roots to Compute the Endpoints of an Interval. Roots are
+    # computed at the given (low) precision. Any root falling within epsilon of 
+    # the ends of the interval, of the starting point, or of the current 
+    # endpoint candidates is recomputed at the refinement precision before it is
+    # compared, as is the candidate it is compared against.
+    def GetExtremes(self, pari, precision = 0, refinePrecision = 0):
         retVal = 0
         leftVal = self.endPoints[0]
         rightVal = self.endPoints[1]
+        leftK = -1
+        rightK = -1
         startVal = self.startPnt[0]
+        bounds = [floor(leftVal), ceil(rightVal)]
+        refine = refinePrecision > precision
 #        print("midpoint: ",startVal)
 
         for k in range(len(self.defIneq)):
             if pari.poldegree(self.defIneq[k]) > 0:
-                roots = pari.polrootsreal(self.defIneq[k], [floor(leftVal), ceil(rightVal)])
+                roots = pari.polrootsreal(self.defIneq[k], bounds, precision = precision)
 #                print("roots: ",roots)
                 roots = Counter(roots)
                 for r, mult in roots.items():
                     if mult % 2 != 0:
+                        if refine and self.IsClose(r, [self.endPoints[0], self.endPoints[1], startVal, leftVal, rightVal]):
+                            r = self.RefineRoot(pari, k, r, bounds, refinePrecision)
+                            if leftK >= 0 and self.IsClose(r, [leftVal]):
+                                leftVal = self.RefineRoot(pari, leftK, leftVal, bounds, refinePrecision)
+                            if rightK >= 0 and self.IsClose(r, [rightVal]):
+                                rightVal = self.RefineRoot(pari, rightK, rightVal, bounds, refinePrecision)
                         if r > leftVal and r < startVal:
                             leftVal = r
+                            leftK = k
                         elif r < rightVal and r > startVal:
                             rightVal = r
+                            rightK = k
                         elif r == startVal:
                             if pari.subst(pari.deriv(self.defIneq[k]), self.xVar[0], startVal) < 0:
                                 leftVal = r
+                                leftK = k
                             else:
                                 rightVal = r
+                                rightK = k
                             
         self.endPoints[0] = leftVal
         self.endPoints[1] = rightVal
         
         return leftVal, rightVal
         
+    # Check whether a value lies within epsilon of any of the given values
+    def IsClose(self, val, others):
+        for other in others:
+            if abs(val - other) < self.eps:
+                return True
+        return False
+        
+    # Recompute a root of the k-th defining inequality at a higher precision
+    def RefineRoot(self, pari, k, r, bounds, refinePrecision):
+        roots = pari.polrootsreal(self.defIneq[k], bounds, precision = refinePrecision)
+        return min(roots, key = lambda s: abs(s - r))
+        
     
     # Use pari to compute the defining inequalities of the invariancy region 
     # (stored in less-than-or-equal-to form). Then, compute the gradient of each
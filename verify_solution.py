@@ -0,0 +1,258 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Verify a solution file written by upLCPsolver. The basic
+#                   variables of each region are evaluated (in floating point,
+#                   using NumPy) at many parameter values within the region,
+#                   including values just inside each endpoint, and checked for
+#                   nonnegativity, complementarity and w - M(x)z = q(x). The
+#                   regions are also checked to cover the parameter space.
+#
+#                   Can be run on its own as
+#
+#                   python3 verify_solution.py /path/to/data/file
+#                       (/path/to/solution/file) (-samples N) (-tolerance t)
+#
+################################################################################
+
+from cypari2 import Pari
+from presolve import ParamInterval
+import numpy as np
+import re
+import sys
+
+
+# Default number of parameter values sampled in the interior of each region
+NUM_SAMPLES = 32
+
+# Default relative tolerance of the checks
+TOLERANCE = 1e-6
+
+
+# Define Functions
+
+# Read the regions listed in a solution file
+#
+# Input:    filename    --  the name of the solution file
+#           numVar      --  the number of variables present in the instance
+#           numRow      --  the number of constraints of the instance (only used
+#                           if the instance is an upLP or upQP)
+#
+# Output:   regions     --  a list of (endPoints, values) pairs, where values is
+#                           a list of (row, isZ, expression) triples, one for
+#                           each basic variable listed
+#           partition   --  the portion of the parameter space the solution
+#                           claims to cover ([] if the entire space, None if the
+#                           solution only answers queries)
+#           problems    --  a list of descriptions of malformed entries
+def ReadRegions(filename, numVar, numRow):
+    regions = []
+    partition = []
+    problems = []
+    values = None
+    with open(filename) as solutionFile:
+        lines = solutionFile.readlines()
+    for line in lines:
+        if re.match(r'^Region \d+:', line.strip()):
+            values = []
+            continue
+        if "Only the regions containing the parameter values" in line:
+            partition = None
+            continue
+        match = re.search(r'Only the portion of the parameter space satisfying\s*(\S+)\s*<=\s*\S+\s*<=\s*(\S+)\s*was partitioned', line)
+        if match and partition is not None:
+            partition = [float(match.group(1)), float(match.group(2))]
+            continue
+        if values is None:
+            continue
+        match = re.match(r'^\s*([wzsuvy])_(\d+)\s*=\s*(.*?)\s*>=\s*0\s*$', line)
+        if match:
+            name = match.group(1)
+            row = int(match.group(2)) - 1
+            if name == 'v' or name == 'y':
+                row += numRow
+            if row < 0 or row >= numVar:
+                problems.append("Region " + str(len(regions) + 1) + " lists " + name + "_" + match.group(2) + ", which does not exist in the instance")
+                continue
+            values.append((row, name in ['z', 'u', 'y'], match.group(3)))
+            continue
+        match = re.match(r'^\s*Valid over:\s*(\S+)\s*<=\s*\S+\s*<=\s*(\S+)', line)
+        if match:
+            regions.append(([float(match.group(1)), float(match.group(2))], values))
+            values = None
+
+    return regions, partition, problems
+
+# Get the coefficients of a rational function as floating point arrays. The
+# numerator and denominator are scaled by the same factor so that neither
+# overflows.
+#
+# Input:    pari    --  the pari environment
+#           f       --  the rational function
+#           x       --  the pari variable in which f is written
+#
+# Output:   num     --  the coefficients of the numerator (highest degree first)
+#           den     --  the coefficients of the denominator (highest degree
+#                       first)
+def Coefficients(pari, f, x):
+    num = pari.numerator(f)
+    den = pari.denominator(f)
+    numCoef = [pari.polcoef(num, k, x) for k in range(int(pari.poldegree(num, x)) + 1)] if num != 0 else [pari.zero()]
+    denCoef = [pari.polcoef(den, k, x) for k in range(int(pari.poldegree(den, x)) + 1)]
+    scale = max(abs(c) for c in denCoef)
+    return np.array([float(c/scale) for c in reversed(numCoef)]), np.array([float(c/scale) for c in reversed(denCoef)])
+
+# Evaluate several polynomials at several points using Horner's rule
+#
+# Input:    coefs   --  a list of coefficient arrays (highest degree first)
+#           points  --  the points at which to evaluate
+#
+# Output:   an array whose (i, s) entry is the value of polynomial i at point s
+def EvaluatePolys(coefs, points):
+    deg = max(len(c) for c in coefs)
+    padded = np.zeros((len(coefs), deg))
+    for i in range(len(coefs)):
+        padded[i, deg - len(coefs[i]):] = coefs[i]
+    vals = np.zeros((len(coefs), len(points)))
+    for k in range(deg):
+        vals = vals*points + padded[:, k:k + 1]
+    return vals
+
+# Verify a solution file
+#
+# Input:    pari        --  the pari environment
+#           filename    --  the name of the solution file
+#           numVar      --  the number of variables present in the instance
+#           numRow      --  the number of constraints of the instance (only used
+#                           if the instance is an upLP or upQP)
+#           gMatrix     --  the original tableau of the instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           paramSpace  --  the constraints defining the parameter space
+#           numSamples  --  the number of parameter values sampled in the
+#                           interior of each region
+#           tolerance   --  the relative tolerance of the checks
+#
+# Output:   problems    --  a list of descriptions of the problems found (empty
+#                           if the solution is valid)
+#           numPoints   --  the number of parameter values checked
+def VerifySolution(pari, filename, numVar, numRow, gMatrix, xVar, paramSpace, numSamples = NUM_SAMPLES, tolerance = TOLERANCE):
+    x = xVar[0]
+    regions, partition, problems = ReadRegions(filename, numVar, numRow)
+
+    # Store M(x) and q(x) as arrays of coefficients, indexed by power of x. The
+    # tableau stores [I | -M | q].
+    deg = max([0] + [int(pari.poldegree(ele, x)) for row in gMatrix for ele in row[numVar:] if ele != 0])
+    negM = np.zeros((deg + 1, numVar, numVar))
+    q = np.zeros((deg + 1, numVar))
+    for i in range(numVar):
+        for j in range(numVar + 1):
+            ele = gMatrix[i][numVar + j]
+            if ele == 0:
+                continue
+            if pari.poldegree(pari.denominator(ele), x) > 0:
+                sys.exit("The entries of M(x) and q(x) must be polynomials in order to verify a solution. Exiting!")
+            for k in range(int(pari.poldegree(ele, x)) + 1):
+                if j < numVar:
+                    negM[k, i, j] = float(pari.polcoef(ele, k, x))
+                else:
+                    q[k, i] = float(pari.polcoef(ele, k, x))
+
+    numPoints = 0
+    for r in range(len(regions)):
+        endPoints, values = regions[r]
+        name = "Region " + str(r + 1) + " (" + str(endPoints[0]) + " <= x <= " + str(endPoints[1]) + ")"
+        if len(values) == 0:
+            problems.append(name + " lists no variables")
+            continue
+        width = endPoints[1] - endPoints[0]
+        inside = max(width*1e-6, 1e-12)
+        points = np.concatenate((np.linspace(endPoints[0], endPoints[1], numSamples + 2)[1:-1], [endPoints[0] + inside, endPoints[1] - inside]))
+        numPoints += len(points)
+
+        # Evaluate the basic variables
+        nums = []
+        dens = []
+        for row, isZ, expr in values:
+            num, den = Coefficients(pari, pari(expr), x)
+            nums.append(num)
+            dens.append(den)
+        vals = EvaluatePolys(nums, points)/EvaluatePolys(dens, points)
+        w = np.zeros((numVar, len(points)))
+        z = np.zeros((numVar, len(points)))
+        listed = np.zeros((2, numVar), dtype = int)
+        for k in range(len(values)):
+            row, isZ, expr = values[k]
+            (z if isZ else w)[row] = vals[k]
+            listed[int(isZ), row] += 1
+        if listed.max() > 1:
+            problems.append(name + " lists a variable more than once")
+        if not np.all(np.isfinite(vals)):
+            problems.append(name + " has a basic variable whose denominator vanishes within the region")
+            continue
+
+        # Compute w - M(x)z - q(x), along with the scale of its terms
+        powers = points[None, :]**np.arange(deg + 1)[:, None]
+        residual = w.copy()
+        scale = 1 + np.abs(w)
+        for k in range(deg + 1):
+            residual += powers[k]*(negM[k] @ z) - powers[k]*q[k][:, None]
+            scale += np.abs(powers[k])*(np.abs(negM[k]) @ np.abs(z)) + np.abs(powers[k]*q[k][:, None])
+
+        worst = np.max(-np.minimum(w, z)/scale)
+        if worst > tolerance:
+            problems.append(name + " has a negative variable (relative value " + '%.3g'%(-worst) + ")")
+        worst = np.max(np.abs(w*z)/scale**2)
+        if worst > tolerance:
+            problems.append(name + " violates complementarity (relative value " + '%.3g'%worst + ")")
+        worst = np.max(np.abs(residual)/scale)
+        if worst > tolerance:
+            problems.append(name + " violates w - M(x)z = q(x) (relative residual " + '%.3g'%worst + ")")
+
+    # Check that the regions cover the parameter space
+    if partition is not None:
+        if len(partition) == 0:
+            lo, hi = ParamInterval(pari, sys, paramSpace, xVar)
+            partition = [float(lo), float(hi)]
+        covered = partition[0]
+        for endPoints, values in sorted(regions):
+            if endPoints[0] - covered > tolerance*(1 + abs(covered)):
+                problems.append("The interval " + str(covered) + " <= x <= " + str(endPoints[0]) + " is not covered by any region")
+            covered = max(covered, endPoints[1])
+        if partition[1] - covered > tolerance*(1 + abs(covered)):
+            problems.append("The interval " + str(covered) + " <= x <= " + str(partition[1]) + " is not covered by any region")
+
+    return problems, numPoints
+
+
+if __name__ == '__main__':
+    from read_problem import ReadFile
+    import logging
+    import time
+
+    pari = Pari()
+    solutionFile = "Solution.txt"
+    numSamples = NUM_SAMPLES
+    tolerance = TOLERANCE
+    i = 2
+    while i < len(sys.argv):
+        if sys.argv[i] == "-samples":
+            i += 1
+            numSamples = int(sys.argv[i])
+        elif sys.argv[i] == "-tolerance":
+            i += 1
+            tolerance = float(sys.argv[i])
+        else:
+            solutionFile = sys.argv[i]
+        i += 1
+
+    t = time.time()
+    numVar, numParam, gMatrix, xVar, paramSpace, mIsNumeric, probType, numRow, numCol = ReadFile(pari, sys, logging, re, 0, 0, 0, 0, [], False, True)
+    problems, numPoints = VerifySolution(pari, solutionFile, numVar, numRow, gMatrix, xVar, paramSpace, numSamples, tolerance)
+    for problem in problems:
+        print(problem)
+    print("Checked " + str(numPoints) + " parameter values in " + str(round(time.time() - t, 2)) + "s: " + ("OK" if len(problems) == 0 else str(len(problems)) + " problems found"))
+    sys.exit(1 if len(problems) > 0 else 0)
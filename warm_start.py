@@ -0,0 +1,178 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Warm start the partitioning of the parameter space using
+#                   the bases found in a previously computed solution file,
+#                   e.g., one computed for the same model with slightly
+#                   different data.
+#
+################################################################################
+
+from matrix_manipulation import *
+from up_inv_region import *
+from precision import ToReal
+import re
+import copy
+
+
+# Define Functions
+
+# Read the regions listed in a solution file written by upLCPsolver
+#
+# Input:    sys         --  the variable containing any information passed at
+#                           the command line
+#           filename    --  the name of the solution file
+#           numVar      --  the number of variables present in the current
+#                           instance
+#           numRow      --  the number of constraints of the current instance
+#                           (only used if the instance is an upLP or upQP)
+#
+# Output:   regions --  a list of (endPoints, basis) pairs, one for each region
+#                       in the solution file
+def ReadSolution(sys, filename, numVar, numRow):
+    regions = []
+    basis = None
+    with open(filename) as solutionFile:
+        lines = solutionFile.readlines()
+    for line in lines:
+        if re.match(r'^Region \d+:', line.strip()):
+            basis = [-1]*numVar
+            continue
+        if basis is None:
+            continue
+        match = re.match(r'^\s*([wzsuvy])_(\d+)\s*=', line)
+        if match:
+            name = match.group(1)
+            row = int(match.group(2)) - 1
+            if name == 'v' or name == 'y':
+                row += numRow
+            if row < 0 or row >= numVar:
+                sys.exit("The solution file " + filename + " refers to variable " + name + "_" + match.group(2) + ", which does not exist in the current instance. Exiting!")
+            if name == 'w' or name == 's' or name == 'v':
+                basis[row] = row
+            else:
+                basis[row] = row + numVar
+            continue
+        match = re.match(r'^\s*Valid over:\s*(\S+)\s*<=\s*\S+\s*<=\s*(\S+)', line)
+        if match:
+            if -1 in basis:
+                sys.exit("A region in the solution file " + filename + " does not list a basic variable for every row of the current instance. Exiting!")
+            regions.append(([float(match.group(1)), float(match.group(2))], basis))
+            basis = None
+
+    return regions
+
+# Use the regions of a previously computed solution to seed the current run.
+# For each old region, the tableau associated with its basis is recovered and
+# checked for feasibility at the midpoint of the old region. Each tableau is
+# obtained by pivoting from the most recently recovered one, since neighboring
+# regions usually differ in only a few basic variables. Bases that remain
+# feasible give invariancy regions of the current instance directly, for which
+# the endpoints are recomputed. The parts of the parameter space not covered by
+# these regions are returned so that they can be processed as usual.
+#
+# Input:    pari        --  the pari environment
+#           sys         --  the variable containing any information passed at
+#                           the command line
+#           filename    --  the name of the solution file
+#           numVar      --  the number of variables present in the current
+#                           instance
+#           numRow      --  the number of constraints of the current instance
+#                           (only used if the instance is an upLP or upQP)
+#           gMatrix     --  the original tableau of the current instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           epsilon     --  a small value used to avoid numerical issues
+#           paramSpace  --  the constraints defining the parameter space
+#           endPoints   --  the endpoints of the parameter space
+#           precision   --  the real precision (in bits) used by Pari
+#           refinePrecision --  the real precision (in bits) used by Pari to
+#                               recompute nearly coincident endpoints
+#           postsolve   --  the Postsolve object of the current instance, if it
+#                           was presolved (the solution file lists the variables
+#                           of the original instance)
+#
+# Output:   regions --  the invariancy regions retained from the old solution
+#           gaps    --  a list of (interval, basis, tableau) triples describing
+#                       the uncovered parts of the parameter space, each paired
+#                       with the basis of a neighboring retained region
+def WarmStart(  pari,
+                sys,
+                filename,
+                numVar,
+                numRow,
+                gMatrix,
+                xVar,
+                epsilon,
+                paramSpace,
+                endPoints,
+                precision,
+                refinePrecision,
+                postsolve = None):
+    if postsolve is None:
+        oldRegions = ReadSolution(sys, filename, numVar, numRow)
+    else:
+        oldRegions = []
+        for oldEndPoints, basis in ReadSolution(sys, filename, postsolve.Original()[0], postsolve.Original()[3]):
+            basis = postsolve.Reduce(basis)
+            if basis is not None:
+                oldRegions.append((oldEndPoints, basis))
+    regions = []
+    lastBasis = list(range(numVar))
+    lastMat = [row[:] for row in gMatrix]
+    for oldEndPoints, basis in sorted(oldRegions):
+        leftVal = max(oldEndPoints[0], float(endPoints[0]))
+        rightVal = min(oldEndPoints[1], float(endPoints[1]))
+        if rightVal - leftVal <= epsilon:
+            continue
+        midpoint = ToReal(pari, (leftVal + rightVal)/2.0, precision)
+
+        # Skip old regions whose midpoint is already covered by a retained
+        # region
+        covered = False
+        for rgn in regions:
+            if rgn.EndPoints()[0] <= midpoint and midpoint <= rgn.EndPoints()[1]:
+                covered = True
+                break
+        if covered:
+            continue
+
+        mat = PivotToBasis([row[:] for row in lastMat], lastBasis, basis, numVar)
+        if mat is None:
+            continue
+        lastBasis = basis
+        lastMat = [row[:] for row in mat]
+        feasible = True
+        for row in mat:
+            if pari.substvec(row[-1], xVar[0:-1], [midpoint, 0]) < 0.0:
+                feasible = False
+                break
+        if not feasible:
+            continue
+
+        rgn = InvRgn(pari, mat, basis, xVar, [midpoint, 0], epsilon, paramSpace, endPoints)
+        rgn.GetExtremes(pari, precision, refinePrecision)
+        regions.append(rgn)
+
+    # Identify the portions of the parameter space that are not yet covered
+    regions.sort(key = lambda r: (r.EndPoints()[0], r.EndPoints()[1]))
+    gaps = []
+    curVal = endPoints[0]
+    prevRgn = None
+    for rgn in regions:
+        if rgn.EndPoints()[0] - curVal > epsilon:
+            seed = rgn if prevRgn is None else prevRgn
+            gaps.append(([curVal, rgn.EndPoints()[0]], copy.deepcopy(seed.Basis()), copy.deepcopy(seed.Tableau())))
+        if rgn.EndPoints()[1] > curVal:
+            curVal = rgn.EndPoints()[1]
+        prevRgn = rgn
+    if endPoints[1] - curVal > epsilon:
+        if prevRgn is None:
+            gaps.append(([curVal, endPoints[1]], list(range(numVar)), [row[:] for row in gMatrix]))
+        else:
+            gaps.append(([curVal, endPoints[1]], copy.deepcopy(prevRgn.Basis()), copy.deepcopy(prevRgn.Tableau())))
+
+    return regions, gaps
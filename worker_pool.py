@@ -0,0 +1,771 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Run the worker processes that partition the parameter
+#                   space. Each worker is initialized from a compact,
+#                   serialized copy of the instance (rather than by inheriting
+#                   the state of the main process), so workers start quickly
+#                   under any multiprocessing start method, and the number of
+#                   workers can be changed while the partition is computed.
+#
+################################################################################
+
+from cypari2 import Pari
+from matrix_manipulation import *
+from crisscross import *
+from up_inv_region import *
+from precision import *
+from worker_resources import *
+from parallel_pivot import PivotHelpers
+from lp_engine import *
+from multiprocessing.managers import SyncManager
+import multiprocessing
+import queue
+import logging
+import time
+import sys
+import os
+
+
+# Number of seconds for which workers must be idle before the pool is shrunk
+SHRINK_DELAY = 5.0
+
+# Fraction of an interval by which the "adjacent" split strategy moves past the
+# known endpoint
+ADJACENT_FRACTION = 0.001
+
+# State of the current worker process, set by InitializeWorker
+pari            = None
+numVar          = 0
+gMatrix         = []
+xVar            = []
+paramSpace      = []
+epsilon         = 0.000001
+precision       = 64
+refinePrecision = 256
+stackSize       = 8000000
+stackSizeMax    = 1000000000
+maxRSS          = 0
+showProgress    = True
+numThreads      = 1
+parallelPivot   = 0
+startMethod     = ""
+splitStrategy   = "midpoint"
+largestFirst    = False
+probType        = "LCP"
+numRow          = 0
+numCol          = 0
+lpEngine        = False
+lpState         = None
+pivotRule       = "leastIndex"
+hybridIterations= 0
+helpers         = None
+rhsColumns      = []
+rhsTableaux     = {}
+deadline        = 0.0
+sliverWidth     = 0.0
+floatEngine     = False
+floatOriginal   = None
+floatState      = None
+
+# Number of pivots performed, and time spent, by the criss cross method in the
+# current worker process, and number of slivers covered without being solved
+# (see CoverSliver), since they were last added to the shared totals
+crissCrossStats = {"pivots": 0, "time": 0.0, "slivers": 0}
+
+# Shared value holding the number of threads the current run may use, set when
+# runs share threads with other runs (see solver_daemon.py)
+threadShare     = None
+
+
+# Define Functions
+
+# Store an instance as plain Python data. Only the nonzero entries of the
+# tableau are kept, each written as a string.
+#
+# Input:    numVar      --  the number of variables present in the instance
+#           gMatrix     --  the original tableau of the instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           paramSpace  --  the constraints defining the parameter space
+#           settings    --  a dictionary of the remaining values needed by the
+#                           workers (epsilon, precision, refinePrecision,
+#                           stackSize, stackSizeMax, maxRSS, showProgress, 
+#                           numThreads, parallelPivot, startMethod, 
+#                           splitStrategy, largestFirst, probType, numRow,
+#                           numCol, lpEngine, pivotRule, hybridIterations,
+#                           rhs, the additional right hand sides of a batch
+#                           written as strings, deadline, the time after
+#                           which no task is started, sliverWidth,
+#                           floatEngine and floatInterval, the interval
+#                           spanned by the parameter space)
+#
+# Output:   instance    --  the serialized instance
+def SerializeInstance(numVar, gMatrix, xVar, paramSpace, settings):
+    instance = dict(settings)
+    instance["numVar"] = numVar
+    instance["xVar"] = [str(x) for x in xVar]
+    instance["tableau"] = [(i, j, str(gMatrix[i][j])) for i in range(numVar) for j in range(2*numVar + 1) if gMatrix[i][j] != 0]
+    instance["paramSpace"] = [[str(val) for val in row] for row in paramSpace]
+    return instance
+
+# Recover an instance from its serialized form. The precision and the stack of
+# Pari are also set.
+#
+# Input:    instance    --  the serialized instance
+#
+# Output:   pari        --  the pari environment
+#           gMatrix     --  the original tableau of the instance
+#           xVar        --  the array containing the pari variables used to
+#                           represent the instance's parameters
+#           paramSpace  --  the constraints defining the parameter space
+def LoadInstance(instance):
+    pari = Pari()
+    SetPrecision(pari, instance["precision"])
+    ConfigureStack(pari, instance["stackSize"], instance["stackSizeMax"])
+    # Create the parameters first so that their priorities match those in the
+    # main process
+    xVar = [pari(name) for name in instance["xVar"]]
+    n = instance["numVar"]
+    gMatrix = [[pari.zero() for j in range(2*n + 1)] for i in range(n)]
+    for i, j, val in instance["tableau"]:
+        gMatrix[i][j] = pari(val)
+    paramSpace = [[pari(val) for val in row] for row in instance["paramSpace"]]
+    return pari, gMatrix, xVar, paramSpace
+
+# Set up the current process as a worker
+#
+# Input:    instance    --  the serialized instance
+def InitializeWorker(instance):
+    global pari, numVar, gMatrix, xVar, paramSpace, epsilon, precision, refinePrecision, stackSize, stackSizeMax, maxRSS, showProgress, numThreads, parallelPivot, startMethod, splitStrategy, largestFirst, probType, numRow, numCol, lpEngine, lpState, pivotRule, hybridIterations, rhsColumns, rhsTableaux, deadline, sliverWidth, floatEngine, floatOriginal, floatState
+    pari, gMatrix, xVar, paramSpace = LoadInstance(instance)
+    numVar          = instance["numVar"]
+    epsilon         = instance["epsilon"]
+    precision       = instance["precision"]
+    refinePrecision = instance["refinePrecision"]
+    stackSize       = instance["stackSize"]
+    stackSizeMax    = instance["stackSizeMax"]
+    maxRSS          = instance["maxRSS"]
+    showProgress    = instance["showProgress"]
+    numThreads      = instance["numThreads"]
+    parallelPivot   = instance["parallelPivot"]
+    startMethod     = instance["startMethod"]
+    splitStrategy   = instance["splitStrategy"]
+    largestFirst    = instance["largestFirst"]
+    probType        = instance.get("probType", "LCP")
+    numRow          = instance.get("numRow", 0)
+    numCol          = instance.get("numCol", 0)
+    lpEngine        = instance.get("lpEngine", False) and probType == "LP"
+    pivotRule       = instance.get("pivotRule", "leastIndex")
+    hybridIterations= instance.get("hybridIterations", 0)
+    if hybridIterations <= 0:
+        hybridIterations = numVar
+    rhsColumns      = [[pari(val) for val in column] for column in instance.get("rhs", [])]
+    rhsTableaux     = {}
+    deadline        = instance.get("deadline", 0.0)
+    sliverWidth     = instance.get("sliverWidth", 0.0)
+    floatEngine     = instance.get("floatEngine", False)
+    if floatEngine:
+        # NumPy is only needed here
+        import float_engine
+        floatOriginal = float_engine.FloatTableauFromMatrix(pari, gMatrix, xVar, instance["floatInterval"])
+        floatState = (floatOriginal, list(range(numVar)))
+    if lpEngine:
+        lpState = LPTableau(pari, gMatrix, numRow, numCol)
+
+# Get the original tableau of the current worker's instance, with its right hand
+# side replaced by the given right hand side of the batch (0 indicates the
+# instance's own right hand side, and j > 0 the jth additional one)
+def RHSTableau(rhs):
+    if rhs == 0:
+        return gMatrix
+    if rhs not in rhsTableaux:
+        rhsTableaux[rhs] = [gMatrix[i][:2*numVar] + [rhsColumns[rhs - 1][i]] for i in range(numVar)]
+    return rhsTableaux[rhs]
+
+# Replace the right hand side of a tableau by the given right hand side of the
+# batch (see RHSTableau). The first numVar columns of the tableau hold the
+# inverse of its basis, so the new right hand side is obtained without pivoting.
+#
+# Input:    mat --  the tableau
+#           rhs --  the index of the right hand side
+#
+# Output:   a copy of mat with the new right hand side
+def ReplaceRHS(mat, rhs):
+    column = [row[-1] for row in RHSTableau(rhs)]
+    return [row[:2*numVar] + [sum(row[l]*column[l] for l in range(numVar) if column[l] != 0)] for row in mat]
+
+# Get the number of worker processes the current run may use
+#
+# Input:    numThreads  --  the number of threads requested for the run
+#
+# Output:   numThreads, reduced to the run's share of the threads if the threads
+#           are shared with other runs
+def ThreadLimit(numThreads):
+    if threadShare is None:
+        return numThreads
+    return max(1, min(numThreads, threadShare.value))
+
+# Add an (interval, basis) pair to the processing queue. The pair is also
+# recorded as pending until it has been processed, so that it can be written to
+# a checkpoint file. If no tableau is given, the worker recovers it from the
+# basis. The queue is a priority queue: tasks are processed in the order they
+# were created, or longest interval first.
+#
+# Input:    q               --  the task queue
+#           pending         --  the dictionary of pending tasks
+#           created         --  the number of tasks created so far
+#           lock            --  the lock protecting created
+#           interval        --  the interval to process
+#           basis           --  the basis from which to start
+#           mat             --  the tableau associated with basis (or None)
+#           hint            --  a (side, width) pair indicating that the end
+#                               interval[side] is shared with a known region of
+#                               the given width (or None)
+#           largestFirst    --  a boolean indicating whether or not longer
+#                               intervals should be processed first
+#           rhs             --  the index of the right hand side of the batch
+#                               for which the interval is processed (see
+#                               RHSTableau)
+def AddTask(q, pending, created, lock, interval, basis, mat, hint, largestFirst, rhs = 0):
+    with lock:
+        taskId = created.value
+        created.value += 1
+    pending[taskId] = (interval, basis)
+    if largestFirst:
+        priority = -float(interval[1] - interval[0])
+    else:
+        priority = taskId
+    q.put( (priority, taskId, (taskId, interval, basis, mat, hint, rhs)) )
+
+# Choose the point of an interval at which to solve. The default is the 
+# midpoint. If one end of the interval is shared with a known region, the 
+# "adjacent" strategy instead chooses a point just past that end (which usually
+# lies in the neighboring region, so few pivots are needed and the region found 
+# is not cut in two), and the "predict" strategy assumes that the next region
+# is as wide as the known one and chooses the point at its predicted center.
+#
+# Input:    interval    --  the interval
+#           hint        --  a (side, width) pair as passed to AddTask (or None)
+#
+# Output:   the point at which to solve
+def SplitPoint(interval, hint):
+    if splitStrategy == "midpoint" or hint is None:
+        mult = pari('1/2')
+        return mult*interval[0] + (1 - mult)*interval[1]
+    length = interval[1] - interval[0]
+    if splitStrategy == "adjacent":
+        offset = ADJACENT_FRACTION*length
+    else:
+        offset = hint[1]/2
+    offset = min(max(offset, 10*epsilon), length/2)
+    if hint[0] == 0:
+        return interval[0] + offset
+    return interval[1] - offset
+
+# Find the invariancy region containing the split point of an interval (see
+# SplitPoint), starting from the given basis and tableau (which are left 
+# unchanged). The pivots may be spread over the given PivotHelpers.
+def SolveInterval(interval, hint, curBasis, curMat, helpers = None):
+    point = [ToReal(pari, SplitPoint(interval, hint), precision), 0]
+    t = time.time()
+    basis, mat, feasible = CrissCross(pari, logging, numVar, [row[:] for row in curMat], xVar, point, epsilon, curBasis[:], helpers, pivotRule, hybridIterations, crissCrossStats)
+    crissCrossStats["time"] += time.time() - t
+
+    if not feasible:
+        sys.exit("Criss Cross failed. Exiting.")
+
+    rgn = InvRgn(pari, mat, basis, xVar, point, epsilon, paramSpace, interval)
+    lval, rval = rgn.GetExtremes(pari, precision, refinePrecision)
+
+    return basis, mat, rgn, lval, rval
+
+# Find the invariancy region containing the split point of an interval of an
+# instance of upLP by pivoting on the LP tableau. The tableau of the previously
+# processed interval is kept by the worker, and is pivoted to the given basis
+# before the criss cross method is started. The region is built from the values
+# of the basic variables of the LCP formulation, so that its basis and 
+# right-hand-side are those that would be found on the tableau of the LCP.
+def SolveIntervalLP(interval, hint, curBasis):
+    global lpState
+    point = [ToReal(pari, SplitPoint(interval, hint), precision), 0]
+    T, lpBasis = LPPivotToBasis([row[:] for row in lpState[0]], lpState[1], LPColumns(curBasis, numRow, numCol))
+    if T is None:
+        T, lpBasis = LPTableau(pari, gMatrix, numRow, numCol)
+    t = time.time()
+    lpBasis, T, feasible = LPCrissCross(pari, T, lpBasis, xVar, point, pivotRule, hybridIterations, crissCrossStats)
+    crissCrossStats["time"] += time.time() - t
+
+    if not feasible:
+        sys.exit("Criss Cross failed. Exiting.")
+
+    lpState = (T, lpBasis)
+    basis = LCPBasis(lpBasis, numRow, numCol)
+    rgn = InvRgn(pari, [[val] for val in LCPValues(T, lpBasis, numRow, numCol)], basis, xVar, point, epsilon, paramSpace, interval)
+    lval, rval = rgn.GetExtremes(pari, precision, refinePrecision)
+
+    return basis, None, rgn, lval, rval
+
+# Find the invariancy region containing the split point of an interval in
+# floating point (see float_engine.py). If no FloatTableau is given, the tableau
+# of the previously processed interval is pivoted to the given basis. Since
+# errors accumulate over pivots, a tableau whose error is too large is rebuilt
+# by pivoting the original tableau directly to its basis, and the rebuilt
+# tableau is kept if it is more accurate. The region's right hand side is
+# written as PARI rational functions having real coefficients, and its
+# endpoints are found by FloatEndPoints rather than by GetExtremes. Regions
+# whose tableau is still inaccurate, or whose basis is nearly singular at the
+# split point, are marked by their estimated relative error (see FloatError in
+# up_inv_region.py). If no feasible basis is found in floating point, the
+# interval is solved exactly by SolveInterval.
+def SolveIntervalFloat(interval, hint, curBasis, curMat):
+    global floatState
+    import float_engine
+    point = float(SplitPoint(interval, hint))
+    if curMat is None:
+        curMat = float_engine.FloatPivotToBasis(floatState[0].Copy(), floatState[1], curBasis)
+    if curMat is None or curMat.Error() > float_engine.ERROR_TOLERANCE:
+        curMat = FloatRebuild(curBasis, None)
+    starts = [(list(range(numVar)), floatOriginal)]
+    if curMat is not None and curMat is not floatOriginal:
+        starts.insert(0, (curBasis, curMat))
+
+    # Pivot from the given basis and, if the pivots were misled by rounding
+    # errors, from the original tableau. A starting basis that is so nearly
+    # singular at the point that its tableau cannot be evaluated there
+    # accurately is of no use. If the basis found is nearly singular, the one
+    # found from the original tableau is tried as well, and the better kept.
+    found = None
+    t = time.time()
+    for start, mat in starts:
+        tableau = mat.Copy(point)
+        if tableau.Singular():
+            continue
+        basis, rows, feasible = CrissCross(pari, logging, numVar, [], xVar, [point, 0], epsilon, start[:], None, pivotRule, hybridIterations, crissCrossStats, tableau)
+        if not feasible or not tableau.Feasible():
+            continue
+        if found is None or tableau.RoundingError() < found[1].RoundingError():
+            found = (basis, tableau)
+        if not tableau.Singular():
+            break
+    crissCrossStats["time"] += time.time() - t
+
+    if found is None:
+        # No feasible basis could be found in floating point, so the interval
+        # is solved exactly instead, starting from the given basis
+        mat = PivotToBasis([row[:] for row in gMatrix], list(range(numVar)), curBasis, numVar)
+        if mat is None:
+            curBasis = list(range(numVar))
+            mat = gMatrix
+        basis, mat, rgn, lval, rval = SolveInterval(interval, hint, curBasis, mat)
+        return basis, None, rgn, lval, rval
+
+    basis, tableau = found
+    error = tableau.Error()
+    if error > float_engine.ERROR_TOLERANCE:
+        rebuilt = FloatRebuild(basis, point)
+        if rebuilt is not None and rebuilt.Error() < error:
+            tableau = rebuilt
+            error = tableau.Error()
+    floatState = (tableau, basis)
+    left, right = float_engine.FloatEndPoints(tableau, interval)
+    lval = interval[0] if left is None else pari(left)
+    rval = interval[1] if right is None else pari(right)
+    error = max([error] + [tableau.RoundingError(float(x)) for x in (lval, point, rval)])
+    numerators, denominator = float_engine.FloatRHS(tableau)
+    den = pari.Pol(denominator[::-1].tolist(), xVar[0])
+    rhs = [[pari.Pol(numer[::-1].tolist(), xVar[0])/den] for numer in numerators]
+    rgn = InvRgn(pari, rhs, basis, xVar, [pari(point), 0], epsilon, paramSpace, [lval, rval])
+    if error > float_engine.ERROR_TOLERANCE:
+        rgn.floatError = error
+
+    return basis, tableau, rgn, lval, rval
+
+# Pivot the original FloatTableau directly to a basis
+#
+# Input:    basis   --  a list indicating the basic variable of each row
+#           point   --  the point at which the tableau is to be evaluated
+#
+# Output:   the FloatTableau, or None if the basis is singular
+def FloatRebuild(basis, point):
+    import float_engine
+    return float_engine.FloatPivotToBasis(floatOriginal.Copy(point), list(range(numVar)), basis)
+
+# Copy the tableau of a task, so that it can be passed on to new tasks
+def CopyTableau(mat):
+    if mat is None:
+        return None
+    if floatEngine:
+        return mat.Copy()
+    return [row[:] for row in mat]
+
+# Decide how many helper processes should share the pivots of the next task.
+# Helpers are only used for large instances, and only while fewer tasks are
+# outstanding than the run may use threads, so that they occupy threads that
+# would otherwise be idle. If the threads are shared with other runs, only the
+# run's share is counted.
+#
+# Input:    outstanding --  the number of tasks created but not yet finished
+#
+# Output:   the number of helpers to use (0 if pivots are to be performed
+#           serially)
+def NumHelpers(outstanding):
+    limit = ThreadLimit(numThreads)
+    if parallelPivot <= 0 or numVar < parallelPivot or outstanding >= limit:
+        return 0
+    num = limit//max(1, outstanding)
+    if num < 2:
+        return 0
+    return num
+
+# Find the invariancy region containing the split point of an interval (see
+# SplitPoint), using the floating point engine, the LP engine or the LCP
+# tableau as set for the current worker. If no tableau is given, it is
+# recovered from the basis. The pivots may be spread over helper processes (see
+# NumHelpers), which are kept for later tasks; if a helper fails, the task is
+# solved again without helpers.
+#
+# Input:    interval    --  the interval to process
+#           hint        --  a (side, width) pair as passed to AddTask (or None)
+#           curBasis    --  the basis from which to start
+#           curMat      --  the tableau associated with curBasis (or None)
+#           outstanding --  the number of tasks created but not yet finished
+#           rhs         --  the index of the right hand side of the batch (see
+#                           RHSTableau)
+#
+# Output:   the (basis, mat, rgn, lval, rval) tuple found (see SolveInterval),
+#           or None if the interval could not be processed within the maximum
+#           PARI stack size
+def SolveTask(interval, hint, curBasis, curMat, outstanding, rhs = 0):
+    global parallelPivot, helpers
+    if floatEngine:
+        return SolveWithRetry(pari, logging, lambda: SolveIntervalFloat(interval, hint, curBasis, curMat), stackSize, stackSizeMax)
+    if lpEngine:
+        return SolveWithRetry(pari, logging, lambda: SolveIntervalLP(interval, hint, curBasis), stackSize, stackSizeMax)
+    if curMat is None:
+        curMat = PivotToBasis([row[:] for row in RHSTableau(rhs)], list(range(numVar)), curBasis, numVar)
+        if curMat is None:
+            curBasis = list(range(numVar))
+            curMat = RHSTableau(rhs)
+    numHelpers = NumHelpers(outstanding)
+    if numHelpers > 0:
+        if helpers is None:
+            helpers = PivotHelpers(multiprocessing.get_context(startMethod if startMethod != "" else None), xVar, precision, stackSize, stackSizeMax)
+        helpers.Use(numHelpers)
+    try:
+        return SolveWithRetry(pari, logging, lambda: SolveInterval(interval, hint, curBasis, curMat, helpers if numHelpers > 0 else None), stackSize, stackSizeMax)
+    except (EOFError, OSError):
+        logging.warning("A pivot helper of thread " + str(os.getpid()) + " failed. Continuing without helpers ...")
+        CloseHelpers()
+        parallelPivot = 0
+        return SolveWithRetry(pari, logging, lambda: SolveInterval(interval, hint, curBasis, curMat), stackSize, stackSizeMax)
+
+# Check whether the region of a basis covers a sliver. Since the sliver is
+# narrow, this is done exactly, and cheaply, by confirming that neither the
+# numerator (i.e., the defining inequality) nor the denominator of any basic
+# variable has a real root inside the sliver, and that the defining
+# inequalities hold at its midpoint. One of the inequalities is tight at the end
+# the sliver shares with the region the basis came from, so a root that agrees
+# with an end of the sliver to half the working precision is taken to be that
+# end.
+#
+# Input:    sliver  --  the interval
+#           basis   --  the basis
+#           mat     --  the tableau associated with basis
+#
+# Output:   the region, with its endpoints set to those of the sliver, or None
+#           if the basis does not cover the sliver
+def SliverRegion(sliver, basis, mat):
+    mid = ToReal(pari, (sliver[0] + sliver[1])/2, precision)
+    rgn = InvRgn(pari, mat, basis, xVar, [mid, 0], epsilon, paramSpace, sliver)
+    bounds = [pari.bestappr(sliver[0]), pari.bestappr(sliver[1])]
+    tol = [2.0**(-precision/2)*max(1, abs(end)) for end in sliver]
+    polys = [(ineq, True) for ineq in rgn.DefIneq()]
+    polys += [(pari.denominator(mat[i][-1]), False) for i in range(len(basis))]
+    for poly, isIneq in polys:
+        if isIneq and pari.substvec(poly, xVar[0:-1], [mid, 0]) > 0:
+            return None
+        if pari.poldegree(poly, xVar[0]) <= 0:
+            continue
+        for r in pari.polrootsreal(poly, bounds, precision = precision):
+            if r - sliver[0] > tol[0] and sliver[1] - r > tol[1]:
+                return None
+    return rgn
+
+# Try to cover a sliver, an interval no wider than sliverWidth that is left
+# between a newly found region and an end of the interval being processed,
+# without solving it. The basis of the known region on the far side of the
+# sliver (if its tableau is at hand) is tried first. Otherwise, if exactly one
+# basic variable of the new region is negative within the sliver (so that the
+# sliver lies just past a single boundary of the region), the basis obtained by
+# a diagonal pivot on its row is tried. No criss cross solve, and no search for
+# the endpoints of the region, is needed in either case.
+#
+# Input:    sliver  --  the interval
+#           basis   --  the basis of the new region
+#           mat     --  the tableau associated with basis
+#           far     --  the (basis, tableau) pair of the known region on the
+#                       other side of the sliver (or None)
+#
+# Output:   the region covering the sliver, or None if it must be solved
+def CoverSliver(sliver, basis, mat, far):
+    if far is not None:
+        rgn = SliverRegion(sliver, far[0], far[1])
+        if rgn is not None:
+            return rgn
+    tableau = Tableau(pari, mat, xVar, [ToReal(pari, (sliver[0] + sliver[1])/2, precision), 0])
+    rows = [i for i in range(numVar) if tableau.Value(i, 2*numVar) < 0]
+    if len(rows) != 1:
+        return None
+    i = rows[0]
+    col = basis[i] + numVar if basis[i] < numVar else basis[i] - numVar
+    if tableau.Value(i, col) >= -epsilon:
+        return None
+    newBasis = list(basis)
+    newBasis[i] = col
+    crissCrossStats["pivots"] += 1
+    return SliverRegion(sliver, newBasis, matrixPivot([row[:] for row in mat], i, col))
+
+# Find the parts of an interval left uncovered on either side of the region
+# found in it. Slivers are covered directly where possible (see CoverSliver),
+# and the remaining parts are returned to be processed as new tasks.
+#
+# Input:    interval    --  the interval processed
+#           hint        --  the hint with which it was processed (the known
+#                           region at interval[hint[0]] is that of curBasis)
+#           curBasis    --  the basis from which it was processed
+#           curMat      --  the tableau associated with curBasis (or None)
+#           basis, mat, lval, rval  --  as returned by SolveTask
+#
+# Output:   slivers     --  the regions covering slivers
+#           children    --  a list of (interval, hint) pairs to be processed
+def RemainingIntervals(interval, hint, curBasis, curMat, basis, mat, lval, rval):
+    slivers = []
+    children = []
+    parts = [([interval[0], lval], 0, (1, rval - lval)), ([rval, interval[1]], 1, (0, rval - lval))]
+    for part, side, childHint in parts:
+        if part[1] - part[0] <= epsilon:
+            continue
+        rgn = None
+        if part[1] - part[0] <= sliverWidth and mat is not None and not floatEngine:
+            far = None
+            if hint is not None and hint[0] == side and curMat is not None:
+                far = (curBasis, curMat)
+            rgn = CoverSliver(part, basis, mat, far)
+        if rgn is None:
+            children.append((part, childHint))
+        else:
+            crissCrossStats["slivers"] += 1
+            slivers.append(rgn)
+    return slivers, children
+
+# Stop the helper processes of the current worker, if any
+def CloseHelpers():
+    global helpers
+    if helpers is not None:
+        helpers.Close()
+        helpers = None
+
+# Process tasks from the queue until a sentinel is received. The pivots performed
+# by the criss cross method, and the time spent in it, are added to the shared
+# dictionary stats after each task. While a task is processed, its queue item is
+# recorded in the shared dictionary active under the id of the worker, so that
+# the pool can recover the task if the worker dies. Intervals that cannot be
+# processed are added to failed as (rhs, interval) pairs. No task is started
+# once the deadline (if any) has passed. Regions consisting of a single point
+# are not added to the partition, since they would be discarded when it is
+# written.
+#
+# When a batch of right hand sides is solved, each task processes an interval
+# for one of them, and so do the tasks it creates. Once the region containing
+# the split point of a starting interval (one with no hint) is found for the
+# instance's own right hand side, a starting task is created for each other
+# right hand side from the same basis, whose tableau is obtained by
+# ReplaceRHS. The pivots on M(x) performed to reach that basis are therefore
+# shared by the whole batch.
+def ProcessQ(q, finalPartition, pending, failed, created, finished, lock, stats, active):
+    if showProgress:
+        print("Activating thread", os.getpid())
+    while True:
+        if deadline > 0 and time.time() >= deadline:
+            break
+        item = q.get(block=True) #block=True means make a blocking call to wait for items in queue
+        taskId, interval, curBasis, curMat, hint, rhs = item[2]
+        if interval is None:
+            break
+        active[os.getpid()] = (item[0], item[1], (taskId, interval, curBasis, None, hint, rhs))
+
+        if showProgress:
+            print("Thread", os.getpid(), "is processing interval", interval)
+
+        result = SolveTask(interval, hint, curBasis, curMat, created.value - finished.value, rhs)
+        if result is None:
+            logging.warning("Unable to process the interval " + str(interval) + " within the maximum PARI stack size. Continuing without it ...")
+            failed.append((rhs, interval))
+        else:
+            basis, mat, rgn, lval, rval = result
+            slivers, children = RemainingIntervals(interval, hint, curBasis, curMat, basis, mat, lval, rval)
+            for found in ([rgn] if lval < rval else []) + slivers:
+                found.rhsIndex = rhs
+                finalPartition.put(found)
+            if rhs == 0 and hint is None:
+                for j in range(1, len(rhsColumns) + 1):
+                    AddTask(q, pending, created, lock, interval, list(basis), ReplaceRHS(mat, j), None, largestFirst, j)
+
+            # No tableau is passed on by the LP engine, since the worker keeps
+            # its own LP tableau
+            for child, childHint in children:
+                AddTask(q, pending, created, lock, child, list(basis), CopyTableau(mat), childHint, largestFirst, rhs)
+        with lock:
+            del pending[taskId]
+            finished.value += 1
+            stats["pivots"] += crissCrossStats["pivots"]
+            stats["time"] += crissCrossStats["time"]
+            stats["slivers"] += crissCrossStats["slivers"]
+            del active[os.getpid()]
+        crissCrossStats["pivots"] = 0
+        crissCrossStats["time"] = 0.0
+        crissCrossStats["slivers"] = 0
+
+        # Exit between tasks if this worker uses too much memory. The pool
+        # replaces it with a fresh process.
+        if ExceedsMemoryLimit(maxRSS):
+            if showProgress:
+                print("Recycling thread", os.getpid(), "after it exceeded the memory limit")
+            CloseHelpers()
+            sys.exit(RECYCLE_EXIT_CODE)
+
+    CloseHelpers()
+
+# Entry point of a worker process
+def RunWorker(instance, q, finalPartition, pending, failed, created, finished, lock, stats, active):
+    InitializeWorker(instance)
+    ProcessQ(q, finalPartition, pending, failed, created, finished, lock, stats, active)
+
+
+# Define the TaskManager Class
+
+# A manager that also provides priority queues, used as task queues
+class TaskManager(SyncManager):
+    pass
+
+TaskManager.register('PriorityQueue', queue.PriorityQueue)
+
+
+# Define the WorkerPool Class
+
+# A set of worker processes whose size can be changed at any time. Workers are
+# stopped by placing sentinels on the task queue, so a worker only stops once
+# it is idle. The task held by a worker that dies is re-queued once; if it kills
+# a second worker, its interval is recorded as failed.
+class WorkerPool:
+    def __init__(self, context, instance, q, finalPartition, pending, failed, created, finished, lock, stats, active):
+        self.context    = context
+        self.args       = (instance, q, finalPartition, pending, failed, created, finished, lock, stats, active)
+        self.q          = q
+        self.pending    = pending
+        self.failed     = failed
+        self.finished   = finished
+        self.lock       = lock
+        self.active     = active
+        self.attempts   = {}
+        self.workers    = []
+        self.stopping   = 0
+        self.idleSince  = None
+        self.sentinels  = 0
+
+    # Queue a sentinel, which is only received once no tasks are waiting
+    def PutSentinel(self):
+        self.sentinels += 1
+        self.q.put((float('inf'), -self.sentinels, (None,None,None,None,None,None)))
+
+    # Return the number of workers that have not been asked to stop
+    def Size(self):
+        return len(self.workers) - self.stopping
+
+    def StartWorker(self):
+        proc = self.context.Process(target = RunWorker, args = self.args)
+        proc.start()
+        self.workers.append(proc)
+
+    # Forget workers that have exited, replacing those that exited to free
+    # memory or that failed
+    def Reap(self):
+        for proc in list(self.workers):
+            if proc.is_alive():
+                continue
+            self.workers.remove(proc)
+            if proc.exitcode == 0:
+                self.stopping = max(0, self.stopping - 1)
+            else:
+                if proc.exitcode != RECYCLE_EXIT_CODE:
+                    logging.warning("Worker process " + str(proc.pid) + " exited with code " + str(proc.exitcode) + ". Starting a replacement ...")
+                    self.RecoverTask(proc.pid)
+                self.StartWorker()
+
+    # Recover the task held by a worker that died, so that the run does not wait
+    # for it forever
+    def RecoverTask(self, pid):
+        with self.lock:
+            item = self.active.pop(pid, None)
+            if item is None:
+                return
+            taskId, interval, rhs = item[2][0], item[2][1], item[2][5]
+            self.attempts[taskId] = self.attempts.get(taskId, 0) + 1
+            if self.attempts[taskId] > 1:
+                logging.warning("The interval " + str(interval) + " was being processed by two workers that died. Continuing without it ...")
+                self.failed.append((rhs, interval))
+                del self.pending[taskId]
+                self.finished.value += 1
+                return
+        self.q.put(item)
+
+    # Grow or shrink the pool to the given number of workers
+    def Resize(self, size):
+        self.Reap()
+        while self.Size() < size:
+            self.StartWorker()
+        while self.Size() > size:
+            self.PutSentinel()
+            self.stopping += 1
+
+    # Adjust the number of workers to the number of outstanding tasks. The pool
+    # grows immediately, but only shrinks once workers have been idle for
+    # SHRINK_DELAY seconds, so that workers are not restarted needlessly.
+    def Balance(self, outstanding, maxSize):
+        target = max(1, min(maxSize, outstanding))
+        if target >= self.Size():
+            self.idleSince = None
+            self.Resize(target)
+        elif self.idleSince is None:
+            self.idleSince = time.time()
+            self.Reap()
+        elif time.time() - self.idleSince >= SHRINK_DELAY:
+            self.idleSince = None
+            self.Resize(target)
+        else:
+            self.Reap()
+
+    # Stop all workers immediately, abandoning the tasks they hold (which remain
+    # pending)
+    def Terminate(self):
+        for proc in self.workers:
+            proc.terminate()
+        for proc in self.workers:
+            proc.join()
+        self.workers = []
+        self.stopping = 0
+
+    # Stop all workers once the queue has been emptied
+    def Close(self):
+        self.Reap()
+        for i in range(self.Size()):
+            self.PutSentinel()
+        self.stopping = len(self.workers)
+        for proc in self.workers:
+            proc.join()
+        self.workers = []
+        self.stopping = 0
@@ -0,0 +1,89 @@
+###############################################################################
+#
+#   Author:         Nathan Adelgren
+#   Affiliation:    Andlinger Center For Energy and the Environment
+#                   Princeton University
+#
+#   Purpose:        Manage the memory used by each worker process: the size of
+#                   the PARI stack, recovery from PARI stack overflows, and the
+#                   recycling of workers whose resident memory grows too large.
+#
+################################################################################
+
+from cypari2 import PariError
+import resource
+import os
+
+
+# Exit code used by a worker process that exits in order to be replaced by a
+# fresh process, rather than because it has failed
+RECYCLE_EXIT_CODE = 75
+
+
+# Define Functions
+
+# Set the initial and maximum size of the PARI stack. PARI starts with a stack
+# of the initial size and automatically doubles it, as needed, up to the
+# maximum size. Objects still in use are moved off of the stack first, so this
+# may be called at any time.
+#
+# Input:    pari            --  the pari environment
+#           stackSize       --  the initial size of the stack (in bytes)
+#           stackSizeMax    --  the maximum size of the stack (in bytes)
+def ConfigureStack(pari, stackSize, stackSizeMax):
+    pari.allocatemem(stackSize, max(stackSize, stackSizeMax), silent = True)
+    pari.default("debugmem", 0)
+
+# Check whether an error raised by PARI indicates that the stack overflowed
+#
+# Input:    err --  the error
+#
+# Output:   a boolean indicating whether or not err is a stack overflow
+def IsStackOverflow(err):
+    return "stack overflows" in err.errtext()
+
+# Run a computation, retrying it once on a fresh PARI stack if the stack
+# overflows. Objects left on the stack by earlier computations count against
+# its maximum size, so a computation that overflows can succeed once they have
+# been cleared. The computation must not modify its inputs, so that it can be
+# retried.
+#
+# Input:    pari            --  the pari environment
+#           logging         --  the logging environment
+#           solve           --  a function (taking no arguments) performing the
+#                               computation
+#           stackSize       --  the initial size of the stack (in bytes)
+#           stackSizeMax    --  the maximum size of the stack (in bytes)
+#
+# Output:   the value returned by solve, or None if the stack overflowed on both
+#           attempts
+def SolveWithRetry(pari, logging, solve, stackSize, stackSizeMax):
+    for attempt in range(2):
+        try:
+            return solve()
+        except PariError as err:
+            if not IsStackOverflow(err):
+                raise
+            logging.warning("The PARI stack of process " + str(os.getpid()) + " overflowed (maximum size: " + str(pari.stacksizemax()) + " bytes). Resetting the stack" + (" and retrying." if attempt == 0 else "."))
+            ConfigureStack(pari, stackSize, stackSizeMax)
+    return None
+
+# Get the resident memory of the current process
+#
+# Output:   the resident memory (in bytes)
+def CurrentRSS():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Fall back on the peak resident memory (reported in kilobytes on Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024
+
+# Check whether the current process should be recycled
+#
+# Input:    maxRSS  --  the maximum resident memory (in bytes) allowed for a
+#                       worker process (0 indicates no limit)
+#
+# Output:   a boolean indicating whether or not the limit has been exceeded
+def ExceedsMemoryLimit(maxRSS):
+    return maxRSS > 0 and CurrentRSS() > maxRSS